@@ -11,13 +11,9 @@ class BasicCache(BaseCaching):
     No limit
     """
 
-    def put(self, key, item):
-        """Add an item in the cache"""
-        if key is not None and item is not None:
-            self.cache_data[key] = item
+    def _is_full(self, count, weight):
+        """Never full, nothing is ever evicted"""
+        return False
 
-    def get(self, key):
-        """retrieve an item form the cache"""
-        if key is None or key not in self.cache_data:
-            return None
-        return self.cache_data.get(key)
+    def _forget(self, key):
+        """Nothing to forget"""
@@ -3,6 +3,8 @@
 '''FIFOCache module'''
 
 
+from collections import deque
+
 from base_caching import BaseCaching
 
 
@@ -10,22 +12,62 @@ class FIFOCache(BaseCaching):
     '''
     FIFOCache inherits from BaseCaching and is a caching system
     '''
-    def __init__(self):
+    def __init__(self, **kwargs):
         '''Initialize FIFOCache'''
-        super().__init__()
-        self.queue = []
-
-    def put(self, key, item):
-        '''Add an item in the queue'''
-        if key is not None and item is not None:
-            if len(self.cache_data) >= self.MAX_ITEMS:
-                first_item = self.queue.pop(0)
-                del self.cache_data[first_item]
-                print("DISCARD: {}".format(first_item))
-            self.cache_data[key] = item
-            self.queue.append(key)
-
-    def get(self, key):
-        '''Get an item by key'''
-        if key is not None:
-            return self.cache_data.get(key)
+        super().__init__(**kwargs)
+        self.queue = deque()
+        # Occurrences of removed keys still in the queue, always the
+        # oldest occurrences of their key
+        self.stale = {}
+        self.stale_count = 0
+
+    def _record_insert(self, key):
+        '''Queue a new key'''
+        self.queue.append(key)
+
+    def _record_update(self, key):
+        '''Updating a key keeps its place in the queue'''
+
+    def _pop_victim(self):
+        '''First key put in the cache'''
+        while True:
+            first_item = self.queue.popleft()
+            if first_item not in self.stale:
+                return first_item
+            self._drop_stale(first_item)
+
+    def _forget(self, key):
+        '''Leave a removed key in the queue until it is popped'''
+        self.stale[key] = self.stale.get(key, 0) + 1
+        self.stale_count += 1
+        if self.stale_count > len(self.cache_data):
+            self._compact()
+
+    def _drop_stale(self, key):
+        '''Account for a stale occurrence leaving the queue'''
+        self.stale_count -= 1
+        if self.stale[key] == 1:
+            del self.stale[key]
+        else:
+            self.stale[key] -= 1
+
+    def _compact(self):
+        '''Rebuild the queue without its stale occurrences'''
+        queue = deque()
+        for key in self.queue:
+            if key in self.stale:
+                self._drop_stale(key)
+            else:
+                queue.append(key)
+        self.queue = queue
+
+    def _ordered_keys(self):
+        '''Keys from the oldest to the newest, without stale ones'''
+        stale = dict(self.stale)
+        keys = []
+        for key in self.queue:
+            if stale.get(key):
+                stale[key] -= 1
+            else:
+                keys.append(key)
+        return keys
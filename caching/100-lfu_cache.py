@@ -5,53 +5,102 @@
 
 
 from base_caching import BaseCaching
+from linked_list import DoublyLinkedList, Node
 
 
 class LFUCache(BaseCaching):
     """ LFUCache inherits from BaseCaching and is a caching system
     """
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """ Initialize LFUCache
         """
-        super().__init__()
+        super().__init__(**kwargs)
         self.freq_counter = {}  # Keeps track of the frequency of each key
+        self.nodes = {}
+        # One recency ordered bucket per frequency, oldest key first
+        self.buckets = {}
+        # Frequencies in use, lowest first, so the minimum is the head
+        self.freq_order = DoublyLinkedList()
+        self.freq_nodes = {}
 
-    def put(self, key, item):
-        """ Add an item in the cache
-        """
-        if key is not None and item is not None:
-            if key in self.cache_data:
-                self.cache_data[key] = item  # Update item
-                self.freq_counter[key] += 1  # Increment frequency
-            else:
-                if len(self.cache_data) >= self.MAX_ITEMS:
-                    # Find keys with the minimum frequency
-                    min_freq = min(self.freq_counter.values())
-                    keys_to_discard = [
-                        k for k, v in self.freq_counter.items()
-                        if v == min_freq]
-                    # If multiple items have the same minimum frequency, use
-                    # LRU
-                    if len(keys_to_discard) > 1:
-                        lru_key = min(
-                            self.freq_counter,
-                            key=lambda k: self.freq_counter[k])
-                        keys_to_discard = [lru_key]
-                    # Discard the keys
-                    for k in keys_to_discard:
-                        del self.cache_data[k]
-                        del self.freq_counter[k]
-                        print("DISCARD: {}".format(k))
-                self.cache_data[key] = item
-                self.freq_counter[key] = 1
-
-    def get(self, key):
-        """ Get an item by key
-        """
-        if key is not None:
-            if key in self.cache_data:
-                self.freq_counter[key] += 1
-                return self.cache_data[key]
-            else:
-                return None
+    def _bucket_after(self, anchor, freq):
+        """ Bucket of a frequency, created right after anchor if needed
+        """
+        bucket = self.buckets.get(freq)
+        if bucket is None:
+            bucket = self.buckets[freq] = DoublyLinkedList()
+            self.freq_nodes[freq] = self.freq_order.insert_after(
+                anchor, Node(freq))
+        return bucket
+
+    def _drop_if_empty(self, freq):
+        """ Forget the bucket of a frequency no key has anymore
+        """
+        if len(self.buckets[freq]) == 0:
+            del self.buckets[freq]
+            self.freq_order.unlink(self.freq_nodes.pop(freq))
+
+    def _record_insert(self, key):
+        """ Add a new key with a frequency of 1
+        """
+        self.freq_counter[key] = 1
+        bucket = self._bucket_after(self.freq_order.sentinel, 1)
+        self.nodes[key] = bucket.append(Node(key))
+
+    def _record_access(self, key):
+        """ Move a key to the next frequency bucket
+        """
+        freq = self.freq_counter[key]
+        node = self.buckets[freq].unlink(self.nodes[key])
+        self._bucket_after(self.freq_nodes[freq], freq + 1).append(node)
+        self._drop_if_empty(freq)
+        self.freq_counter[key] = freq + 1
+
+    def _pop_victim(self):
+        """ Least recently used key of the lowest frequency
+        """
+        min_freq = self.freq_order.head().key
+        k = self.buckets[min_freq].pop_head().key
+        self._drop_if_empty(min_freq)
+        del self.freq_counter[k]
+        del self.nodes[k]
+        return k
+
+    def _forget(self, key):
+        """ Stop tracking a key
+        """
+        freq = self.freq_counter.pop(key)
+        self.buckets[freq].unlink(self.nodes.pop(key))
+        self._drop_if_empty(freq)
+
+    def _ordered_keys(self):
+        """ Keys by increasing frequency, then recency
+        """
+        return [key for freq in self.freq_order
+                for key in self.buckets[freq]]
+
+    def _key_meta(self, key):
+        """ Frequency of a key
+        """
+        return self.freq_counter[key]
+
+    def _restore_meta(self, key, meta):
+        """ Move a key put back to its frequency bucket
+        """
+        if meta == 1:
+            return
+        self._forget(key)
+        self.freq_counter[key] = meta
+        bucket = self._bucket_after(self._anchor_below(meta), meta)
+        self.nodes[key] = bucket.append(Node(key))
+
+    def _anchor_below(self, freq):
+        """ Node of the highest frequency in use below freq, or the
+        sentinel; keys of a snapshot come back by increasing frequency,
+        so it is usually the tail
+        """
+        node = self.freq_order.sentinel.prev
+        while node is not self.freq_order.sentinel and node.key > freq:
+            node = node.prev
+        return node
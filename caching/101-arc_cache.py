@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+'''ARCCache module'''
+
+
+from base_caching import BaseCaching
+from linked_list import DoublyLinkedList, KeyedLists
+
+
+class ARCCache(BaseCaching):
+    '''ARCCache inherits from BaseCaching and is an Adaptive Replacement
+    caching system.
+
+    Keys seen once live in t1 and keys seen again in t2, both in LRU
+    order. The keys they evict are remembered, without their item, in
+    the ghost lists b1 and b2. A miss on a ghost key moves the target
+    size p of t1 towards the list that should not have lost it.'''
+
+    def __init__(self, **kwargs):
+        '''Initialize ARCCache'''
+        super().__init__(**kwargs)
+        self.t1 = DoublyLinkedList()
+        self.t2 = DoublyLinkedList()
+        self.b1 = DoublyLinkedList()
+        self.b2 = DoublyLinkedList()
+        self.index = KeyedLists()
+        self.p = 0
+        self.incoming = None
+        self.batching = False
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in the cache'''
+        if key is not None and item is not None:
+            self.incoming = key
+            if not self.batching:
+                self._adapt(key)
+        super().put(key, item, ttl)
+
+    def put_many(self, mapping, ttl=None):
+        '''Add every item of a dict, adapting p to its ghost keys first'''
+        for key, item in mapping.items():
+            if key is not None and item is not None:
+                self._adapt(key)
+        self.incoming = None
+        self.batching = True
+        try:
+            super().put_many(mapping, ttl)
+        finally:
+            self.batching = False
+
+    def _adapt(self, key):
+        '''Move p towards the list which should not have lost a ghost'''
+        if self.index.list_of(key) is self.b1:
+            # Recency list was too short
+            ratio = max(len(self.b2) / len(self.b1), 1)
+            self.p = min(self.p + ratio, self.MAX_ITEMS)
+        elif self.index.list_of(key) is self.b2:
+            # Frequency list was too short
+            ratio = max(len(self.b1) / len(self.b2), 1)
+            self.p = max(self.p - ratio, 0)
+
+    def _record_insert(self, key):
+        '''Add a new key to t1, or to t2 if it is a ghost'''
+        if key in self.index:
+            self.index.link(key, self.t2)
+            return
+        self.index.link(key, self.t1)
+        # Remember at most MAX_ITEMS recent and 2 * MAX_ITEMS keys overall
+        while len(self.t1) + len(self.b1) > self.MAX_ITEMS and self.b1:
+            self.index.unlink(self.b1.head().key)
+        while len(self.index) > 2 * self.MAX_ITEMS:
+            ghosts = self.b2 if self.b2 else self.b1
+            self.index.unlink(ghosts.head().key)
+
+    def _record_access(self, key):
+        '''Move a key seen again to t2'''
+        self.index.link(key, self.t2)
+
+    def _pop_victim(self):
+        '''Least recently used key of t1 or t2, depending on p'''
+        in_b2 = self.index.list_of(self.incoming) is self.b2
+        if self.t1 and (not self.t2 or len(self.t1) > self.p or
+                        (in_b2 and len(self.t1) == self.p)):
+            victim = self.t1.head().key
+            self.index.link(victim, self.b1)
+        else:
+            victim = self.t2.head().key
+            self.index.link(victim, self.b2)
+        return victim
+
+    def _forget(self, key):
+        '''Stop tracking a key, without remembering it as a ghost'''
+        self.index.unlink(key)
+
+    def _ordered_keys(self):
+        '''Keys of t1 then t2, from the least to the most recently used'''
+        return list(self.t1) + list(self.t2)
+
+    def _key_meta(self, key):
+        '''Whether a key was seen again'''
+        return self.index.list_of(key) is self.t2
+
+    def _restore_meta(self, key, meta):
+        '''Move a key seen again back to t2'''
+        if meta:
+            self.index.link(key, self.t2)
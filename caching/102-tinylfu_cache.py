@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+'''TinyLFUCache module'''
+
+
+from base_caching import BaseCaching
+from count_min_sketch import CountMinSketch
+from linked_list import DoublyLinkedList, KeyedLists
+
+
+class TinyLFUCache(BaseCaching):
+    '''TinyLFUCache inherits from BaseCaching and is a W-TinyLFU
+    caching system.
+
+    New keys enter a small window LRU. Keys leaving the window compete
+    with the victim of the main segmented LRU, and only the one a count
+    min sketch estimates to be the most frequent stays. Main keys start
+    in probation and are protected once they are hit again.'''
+
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+
+    def __init__(self, **kwargs):
+        '''Initialize TinyLFUCache'''
+        super().__init__(**kwargs)
+        self.window_size = max(1, int(self.MAX_ITEMS * self.WINDOW_RATIO))
+        main_size = max(self.MAX_ITEMS - self.window_size, 1)
+        self.protected_size = int(main_size * self.PROTECTED_RATIO)
+        self.sketch = CountMinSketch(self.MAX_ITEMS)
+        self.window = DoublyLinkedList()
+        self.probation = DoublyLinkedList()
+        self.protected = DoublyLinkedList()
+        self.index = KeyedLists()
+
+    def _record_insert(self, key):
+        '''Add a new key to the window'''
+        self.sketch.increment(key)
+        self.index.link(key, self.window)
+        if len(self.window) > self.window_size:
+            # There is room left in the main segments
+            self.index.link(self.window.head().key, self.probation)
+
+    def _record_access(self, key):
+        '''Count a hit and protect main keys hit again'''
+        self.sketch.increment(key)
+        if self.index.list_of(key) is self.window:
+            self.index.link(key, self.window)
+            return
+        self.index.link(key, self.protected)
+        if len(self.protected) > self.protected_size:
+            self.index.link(self.protected.head().key, self.probation)
+
+    def _pop_victim(self):
+        '''Loser of the window candidate against the main victim'''
+        main = self.probation if self.probation else self.protected
+        if not main:
+            victim = self.window.head().key
+        elif len(self.window) < self.window_size:
+            victim = main.head().key
+        else:
+            candidate = self.window.head().key
+            victim = main.head().key
+            if (self.sketch.frequency(candidate) >
+                    self.sketch.frequency(victim)):
+                self.index.link(candidate, self.probation)
+            else:
+                victim = candidate
+        self.index.unlink(victim)
+        return victim
+
+    def _forget(self, key):
+        '''Stop tracking a key'''
+        self.index.unlink(key)
+
+    def _ordered_keys(self):
+        '''Keys of probation, protected then window, oldest first'''
+        return (list(self.probation) + list(self.protected) +
+                list(self.window))
+
+    def _key_meta(self, key):
+        '''Segment of a key'''
+        if self.index.list_of(key) is self.window:
+            return 'window'
+        if self.index.list_of(key) is self.probation:
+            return 'probation'
+        return 'protected'
+
+    def _restore_meta(self, key, meta):
+        '''Move a key put back to its segment'''
+        self.sketch.increment(key)
+        if meta != 'window':
+            self.index.link(key, getattr(self, meta))
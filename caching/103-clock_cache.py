@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+'''ClockCache module'''
+
+
+from collections import deque
+
+from base_caching import BaseCaching
+
+
+class ClockCache(BaseCaching):
+    '''ClockCache inherits from BaseCaching and is a CLOCK (second
+    chance) caching system.
+
+    Keys sit in a preallocated ring of MAX_ITEMS slots. A hit only sets
+    the reference bit of its slot; to evict, the hand sweeps the ring,
+    clearing the bits it finds set, and takes the first key whose bit
+    is already clear.'''
+
+    def __init__(self, **kwargs):
+        '''Initialize ClockCache'''
+        super().__init__(**kwargs)
+        self.slots = [None] * self.MAX_ITEMS
+        self.referenced = bytearray(self.MAX_ITEMS)
+        self.positions = {}
+        # Slots are reused in the order they were freed
+        self.free = deque(range(self.MAX_ITEMS))
+        self.hand = 0
+
+    def _record_insert(self, key):
+        '''Put a new key in a free slot'''
+        index = self.free.popleft()
+        self.slots[index] = key
+        self.referenced[index] = 0
+        self.positions[key] = index
+
+    def _record_access(self, key):
+        '''Set the reference bit of a key'''
+        self.referenced[self.positions[key]] = 1
+
+    def _pop_victim(self):
+        '''First unreferenced key under the hand'''
+        slots = self.slots
+        referenced = self.referenced
+        while True:
+            index = self.hand
+            self.hand = (index + 1) % len(slots)
+            if slots[index] is None:
+                continue
+            if referenced[index]:
+                referenced[index] = 0
+                continue
+            victim = slots[index]
+            self._forget(victim)
+            return victim
+
+    def _forget(self, key):
+        '''Free the slot of a key'''
+        index = self.positions.pop(key)
+        self.slots[index] = None
+        self.free.append(index)
+
+    def _ordered_keys(self):
+        '''Keys in the order the hand reaches them'''
+        count = len(self.slots)
+        return [self.slots[(self.hand + offset) % count]
+                for offset in range(count)
+                if self.slots[(self.hand + offset) % count] is not None]
+
+    def _key_meta(self, key):
+        '''Reference bit of a key'''
+        return self.referenced[self.positions[key]]
+
+    def _restore_meta(self, key, meta):
+        '''Set the reference bit of a key put back'''
+        self.referenced[self.positions[key]] = meta
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+'''SLRUCache module'''
+
+
+from base_caching import BaseCaching
+from linked_list import DoublyLinkedList, KeyedLists
+
+
+class SLRUCache(BaseCaching):
+    '''SLRUCache inherits from BaseCaching and is a Segmented LRU
+    caching system.
+
+    New keys enter the probationary segment and are only moved to the
+    protected segment when they are hit. Keys pushed out of the
+    protected segment get another chance in probation, and evictions
+    always take the least recently used key of probation first.'''
+
+    PROTECTED_RATIO = 0.8
+
+    def __init__(self, **kwargs):
+        '''Initialize SLRUCache'''
+        super().__init__(**kwargs)
+        self.protected_size = max(
+            1, int(self.MAX_ITEMS * self.PROTECTED_RATIO))
+        self.probation = DoublyLinkedList()
+        self.protected = DoublyLinkedList()
+        self.index = KeyedLists()
+
+    def _record_insert(self, key):
+        '''Add a new key to probation'''
+        self.index.link(key, self.probation)
+
+    def _record_access(self, key):
+        '''Protect a key that is hit'''
+        self.index.link(key, self.protected)
+        if len(self.protected) > self.protected_size:
+            self.index.link(self.protected.head().key, self.probation)
+
+    def _pop_victim(self):
+        '''Least recently used key of probation, or of protected'''
+        segment = self.probation if self.probation else self.protected
+        victim = segment.head().key
+        self.index.unlink(victim)
+        return victim
+
+    def _forget(self, key):
+        '''Stop tracking a key'''
+        self.index.unlink(key)
+
+    def _ordered_keys(self):
+        '''Keys of probation then protected, oldest first'''
+        return list(self.probation) + list(self.protected)
+
+    def _key_meta(self, key):
+        '''Whether a key is protected'''
+        return self.index.list_of(key) is self.protected
+
+    def _restore_meta(self, key, meta):
+        '''Move a protected key back to protected'''
+        if meta:
+            self.index.link(key, self.protected)
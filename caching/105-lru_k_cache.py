@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+'''LRUKCache module'''
+
+
+import heapq
+from collections import deque
+
+from base_caching import BaseCaching
+from linked_list import DoublyLinkedList, Node
+
+
+class LRUKCache(BaseCaching):
+    '''LRUKCache inherits from BaseCaching and is an LRU-K caching
+    system, LRU-2 by default.
+
+    Only hits count as references, so putting a key and getting it once
+    is not enough to compete with hot keys. Keys hit fewer than K times
+    are evicted first, least recently used first. Then the key whose
+    K-th most recent hit is the oldest goes.'''
+
+    K = 2
+
+    def __init__(self, k=None, **kwargs):
+        '''Initialize LRUKCache'''
+        super().__init__(**kwargs)
+        if k is not None:
+            if k < 1:
+                raise ValueError("k must be at least 1")
+            self.K = k
+        self.clock_tick = 0
+        # Times of the last K hits of every key, oldest first
+        self.history = {}
+        # Keys hit fewer than K times, in LRU order
+        self.cold = DoublyLinkedList()
+        self.nodes = {}
+        # (K-th most recent hit, key) of the other keys, outdated
+        # entries are skipped when popped
+        self.heap = []
+
+    def _record_insert(self, key):
+        '''Add a new key, with no hit yet'''
+        self.history[key] = deque(maxlen=self.K)
+        self.nodes[key] = self.cold.append(Node(key))
+
+    def _record_access(self, key):
+        '''Record the time of a hit'''
+        self.clock_tick += 1
+        history = self.history[key]
+        history.append(self.clock_tick)
+        if len(history) < self.K:
+            self.cold.move_to_tail(self.nodes[key])
+            return
+        node = self.nodes.pop(key, None)
+        if node is not None:
+            self.cold.unlink(node)
+        heapq.heappush(self.heap, (history[0], key))
+        if len(self.heap) > 2 * (len(self.history) - len(self.cold)) + 16:
+            self._compact()
+
+    def _record_update(self, key):
+        '''Putting a key again is not a reference'''
+
+    def _pop_victim(self):
+        '''Cold key or key with the oldest K-th most recent hit'''
+        if self.cold:
+            victim = self.cold.pop_head().key
+            del self.nodes[victim]
+            del self.history[victim]
+            return victim
+        while True:
+            time, victim = heapq.heappop(self.heap)
+            history = self.history.get(victim)
+            if history is not None and history[0] == time:
+                del self.history[victim]
+                return victim
+
+    def _forget(self, key):
+        '''Stop tracking a key, its heap entries become outdated'''
+        del self.history[key]
+        node = self.nodes.pop(key, None)
+        if node is not None:
+            self.cold.unlink(node)
+
+    def _compact(self):
+        '''Rebuild the heap without its outdated entries'''
+        self.heap = [(history[0], key)
+                     for key, history in self.history.items()
+                     if key not in self.nodes]
+        heapq.heapify(self.heap)
+
+    def _ordered_keys(self):
+        '''Cold keys in LRU order, then the others by K-th hit time'''
+        hot = [key for key in self.history if key not in self.nodes]
+        hot.sort(key=lambda key: self.history[key][0])
+        return list(self.cold) + hot
+
+    def _key_meta(self, key):
+        '''Times of the last hits of a key'''
+        return tuple(self.history[key])
+
+    def _restore_meta(self, key, meta):
+        '''Put back the hits of a key'''
+        history = self.history[key]
+        history.extend(meta)
+        if history:
+            self.clock_tick = max(self.clock_tick, history[-1])
+        if len(history) == self.K:
+            self.cold.unlink(self.nodes.pop(key))
+            heapq.heappush(self.heap, (history[0], key))
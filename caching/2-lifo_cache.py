@@ -3,6 +3,8 @@
 '''LIFOCache module'''
 
 
+from collections import deque
+
 from base_caching import BaseCaching
 
 
@@ -10,22 +12,65 @@ class LIFOCache(BaseCaching):
     '''LIFOCache inherits from BaseCaching and is a
     caching system'''
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         '''Initialize LIFOCache'''
-        super().__init__()
-        self.stack = []
-
-    def put(self, key, item):
-        '''Add an item in the cache'''
-        if key is not None and item is not None:
-            if len(self.cache_data) >= self.MAX_ITEMS:
-                last_item = self.stack.pop()
-                del self.cache_data[last_item]
-                print('DISCARD: {}'.format(last_item))
-            self.cache_data[key] = item
-            self.stack.append(key)
-
-    def get(self, key):
-        '''Get an item by key'''
-        if key is not None:
-            return self.cache_data.get(key)
+        super().__init__(**kwargs)
+        self.stack = deque()
+        # Occurrences of removed keys still in the stack, always the
+        # oldest occurrences of their key
+        self.stale = {}
+        self.stale_count = 0
+
+    def _record_insert(self, key):
+        '''Stack a new key'''
+        self.stack.append(key)
+
+    def _record_update(self, key):
+        '''Move a key put again to the top of the stack'''
+        self._forget(key)
+        self.stack.append(key)
+
+    def _pop_victim(self):
+        '''Last key put in the cache'''
+        while True:
+            last_item = self.stack.pop()
+            # The newest occurrence of a cached key is never stale
+            if last_item in self.cache_data:
+                return last_item
+            self._drop_stale(last_item)
+
+    def _forget(self, key):
+        '''Leave a removed key in the stack until it is popped'''
+        self.stale[key] = self.stale.get(key, 0) + 1
+        self.stale_count += 1
+        if self.stale_count > len(self.cache_data):
+            self._compact()
+
+    def _drop_stale(self, key):
+        '''Account for a stale occurrence leaving the stack'''
+        self.stale_count -= 1
+        if self.stale[key] == 1:
+            del self.stale[key]
+        else:
+            self.stale[key] -= 1
+
+    def _compact(self):
+        '''Rebuild the stack without its stale occurrences'''
+        stack = deque()
+        for key in self.stack:
+            if key in self.stale:
+                self._drop_stale(key)
+            else:
+                stack.append(key)
+        self.stack = stack
+
+    def _ordered_keys(self):
+        '''Keys from the oldest to the newest, without stale ones'''
+        stale = dict(self.stale)
+        keys = []
+        for key in self.stack:
+            if stale.get(key):
+                stale[key] -= 1
+            else:
+                keys.append(key)
+        return keys
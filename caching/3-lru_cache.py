@@ -4,33 +4,37 @@
 
 
 from base_caching import BaseCaching
+from linked_list import DoublyLinkedList, Node
 
 
 class LRUCache(BaseCaching):
     '''LRUCache inherits from BaseCaching and is a
     caching system'''
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         '''Initialize LRUCache'''
-        super().__init__()
-        self.order = []
-
-    def put(self, key, item):
-        '''Add an item in the cache'''
-        if key is not None and item is not None:
-            if len(self.cache_data) >= self.MAX_ITEMS:
-                lru_key = self.order.pop(0)
-                del self.cache_data[lru_key]
-                print('DISCARD: {}'.format(lru_key))
-            self.cache_data[key] = item
-            self.order.append(key)
-
-    def get(self, key):
-        '''Get an item by key'''
-        if key is not None:
-            if key in self.cache_data:
-                self.order.remove(key)
-                self.order.append(key)
-                return self.cache_data[key]
-            else:
-                return None
+        super().__init__(**kwargs)
+        self.order = DoublyLinkedList()
+        self.nodes = {}
+
+    def _record_insert(self, key):
+        '''Add a new key as the most recently used'''
+        self.nodes[key] = self.order.append(Node(key))
+
+    def _record_access(self, key):
+        '''Mark a key as the most recently used'''
+        self.order.move_to_tail(self.nodes[key])
+
+    def _pop_victim(self):
+        '''Least recently used key'''
+        lru_key = self.order.pop_head().key
+        del self.nodes[lru_key]
+        return lru_key
+
+    def _forget(self, key):
+        '''Stop tracking a key'''
+        self.order.unlink(self.nodes.pop(key))
+
+    def _ordered_keys(self):
+        '''Keys from the least to the most recently used'''
+        return list(self.order)
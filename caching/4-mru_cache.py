@@ -1,38 +1,42 @@
 #!/usr/bin/python3
 '''MRUCache module'''
 from base_caching import BaseCaching
+from linked_list import DoublyLinkedList, Node
 
 
 class MRUCache(BaseCaching):
     """ MRUCache inherits from BaseCaching and is a caching system
     """
-    def __init__(self):
+    def __init__(self, **kwargs):
         """ Initialize MRUCache
         """
-        super().__init__()
-        self.access_order = []
+        super().__init__(**kwargs)
+        self.access_order = DoublyLinkedList()
+        self.nodes = {}
 
-    def put(self, key, item):
-        """ Add an item in the cache
+    def _record_insert(self, key):
+        """ Add a new key as the most recently used
         """
-        if key is not None and item is not None:
-            if key in self.cache_data:
-                # Remove the key if it already exists
-                self.access_order.remove(key)
-            elif len(self.cache_data) >= self.MAX_ITEMS:
-                # Evict the most recently used item
-                mru_key = self.access_order.pop(-1)
-                del self.cache_data[mru_key]
-                print("DISCARD: {}".format(mru_key))
-            self.cache_data[key] = item
-            self.access_order.append(key)
+        self.nodes[key] = self.access_order.append(Node(key))
 
-    def get(self, key):
-        """ Get an item by key
+    def _record_access(self, key):
+        """ Move accessed key to the most recently used position
         """
-        if key is not None and key in self.cache_data:
-            # Move accessed key to the most recently used position
-            self.access_order.remove(key)
-            self.access_order.append(key)
-            return self.cache_data[key]
-        return None
+        self.access_order.move_to_tail(self.nodes[key])
+
+    def _pop_victim(self):
+        """ Evict the most recently used item
+        """
+        mru_key = self.access_order.pop_tail().key
+        del self.nodes[mru_key]
+        return mru_key
+
+    def _forget(self, key):
+        """ Stop tracking a key
+        """
+        self.access_order.unlink(self.nodes.pop(key))
+
+    def _ordered_keys(self):
+        """ Keys from the least to the most recently used
+        """
+        return list(self.access_order)
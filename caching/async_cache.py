@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+'''AsyncCache module'''
+
+
+import asyncio
+import threading
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+# Bounds in seconds of the sleeps between two tries to take the lock
+MIN_BACKOFF = 0.00005
+MAX_BACKOFF = 0.01
+
+
+class AsyncCache:
+    '''
+    AsyncCache is an asyncio facade over any BaseCaching policy.
+
+    The policy is guarded by a thread lock so executor threads can use
+    it too, through the *_sync methods. Coroutines never block on that
+    lock: they try to take it and sleep, backing off up to MAX_BACKOFF,
+    until it is free. get_or_load runs a single load per key on the
+    event loop, and every coroutine awaiting that key shares its result
+    or exception.
+    '''
+
+    def __init__(self, policy=LRUCache, **kwargs):
+        '''Initialize AsyncCache with an instance of policy(**kwargs)'''
+        self.cache = policy(**kwargs)
+        self.lock = threading.Lock()
+        self.loads = {}
+
+    async def _acquire(self):
+        '''
+        Take the lock without blocking the event loop, sleeping longer
+        and longer while a thread holds it
+        '''
+        delay = 0
+        while not self.lock.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(max(delay * 2, MIN_BACKOFF), MAX_BACKOFF)
+
+    async def get(self, key):
+        '''Get an item by key'''
+        await self._acquire()
+        try:
+            return self.cache.get(key)
+        finally:
+            self.lock.release()
+
+    async def put(self, key, item, ttl=None):
+        '''Add an item in the cache'''
+        await self._acquire()
+        try:
+            self.cache.put(key, item, ttl)
+        finally:
+            self.lock.release()
+
+    async def delete(self, key):
+        '''Remove an item by key and return it'''
+        await self._acquire()
+        try:
+            return self.cache.delete(key)
+        finally:
+            self.lock.release()
+
+    async def get_many(self, keys):
+        '''Dict of the items cached for keys'''
+        await self._acquire()
+        try:
+            return self.cache.get_many(keys)
+        finally:
+            self.lock.release()
+
+    async def put_many(self, mapping, ttl=None):
+        '''Add every item of a dict in the cache'''
+        await self._acquire()
+        try:
+            self.cache.put_many(mapping, ttl)
+        finally:
+            self.lock.release()
+
+    async def delete_many(self, keys):
+        '''Remove items by key and return how many were removed'''
+        await self._acquire()
+        try:
+            return self.cache.delete_many(keys)
+        finally:
+            self.lock.release()
+
+    async def get_or_load(self, key, loader, ttl=None):
+        '''
+        Get an item by key, awaiting loader(key) on a miss and caching
+        its result unless it is None
+        '''
+        item = await self.get(key)
+        if item is not None:
+            return item
+        load = self.loads.get(key)
+        if load is None:
+            load = asyncio.ensure_future(self._load(key, loader, ttl))
+            self.loads[key] = load
+        # A cancelled caller must not cancel the load of the others
+        return await asyncio.shield(load)
+
+    async def _load(self, key, loader, ttl):
+        '''Await the loader and cache its result'''
+        try:
+            item = await loader(key)
+            if item is not None:
+                await self.put(key, item, ttl)
+            return item
+        finally:
+            del self.loads[key]
+
+    def get_sync(self, key):
+        '''Get an item by key from a thread'''
+        with self.lock:
+            return self.cache.get(key)
+
+    def put_sync(self, key, item, ttl=None):
+        '''Add an item in the cache from a thread'''
+        with self.lock:
+            self.cache.put(key, item, ttl)
+
+    def delete_sync(self, key):
+        '''Remove an item by key from a thread and return it'''
+        with self.lock:
+            return self.cache.delete(key)
+
+    def stats(self):
+        '''Counters and size of the cache'''
+        with self.lock:
+            return self.cache.stats()
@@ -1,30 +1,367 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import sys
+import time
+
+from cache_stats import CacheStats, timed
+from timer_wheel import TimerWheel
+
+
+CAPACITY = "capacity"
+EXPIRED = "expired"
+EXPLICIT = "explicit"
+
+
+def print_discard(key, item, reason):
+    """Default eviction listener, prints the keys evicted to make room"""
+    if reason == CAPACITY:
+        print("DISCARD: {}".format(key))
+
+
+def default_sizer(key, item):
+    """Shallow size in bytes of a cache entry"""
+    return sys.getsizeof(key) + sys.getsizeof(item)
 
 
 class BaseCaching:
     """BaseCaching defines:
     - constants of your caching system
     - where your data are stored (in a dictionary)
+
+    The capacity is set per instance: max_items bounds the number of
+    entries (MAX_ITEMS by default) and max_bytes optionally bounds the
+    total weight of the entries, as measured by sizer(key, item).
+
+    Every entry leaving the cache is reported to listener(key, item,
+    reason), reason being CAPACITY, EXPIRED or EXPLICIT. The default
+    listener prints the evicted keys, None disables the notifications.
+
+    Entries live for ttl seconds by default, or for the ttl given to put,
+    or forever when both are None. Expired entries are dropped lazily by
+    get and actively by reap, which put runs, using a timer wheel fed
+    with the deadlines from clock().
+
+    Hits, misses, puts, updates and evictions are counted and reported
+    by stats(); latency=True also records get and put latencies.
+
+    put, get and delete, and their batch versions put_many, get_many and
+    delete_many, drive the policy of a subclass through its hooks:
+    _record_insert, _record_access, _record_update, _pop_victim and
+    _forget. dump_entries and restore_entry save and rebuild its state
+    through _ordered_keys, _key_meta and _restore_meta.
     """
 
     MAX_ITEMS = 4
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 listener=print_discard, ttl=None, clock=time.monotonic,
+                 latency=False):
         """Initiliaze"""
+        if max_items is not None:
+            if max_items < 1:
+                raise ValueError("max_items must be at least 1")
+            self.MAX_ITEMS = max_items
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
         self.cache_data = {}
+        self.max_bytes = max_bytes
+        self.sizer = sizer if sizer is not None else default_sizer
+        self.weights = {}
+        self.total_bytes = 0
+        self.listener = listener
+        self.ttl = ttl
+        self.clock = clock
+        self.expiries = {}
+        self.wheel = None
+        self.counters = CacheStats(latency)
+        if latency:
+            self.get = timed(self.get, self.counters.get_latency)
+            self.put = timed(self.put, self.counters.put_latency)
 
     def print_cache(self):
         """Print the cache"""
+        self.reap()
         print("Current cache:")
         for key in sorted(self.cache_data.keys()):
             print("{}: {}".format(key, self.cache_data.get(key)))
 
-    def put(self, key, item):
-        """Add an item in the cache"""
-        raise NotImplementedError("put must be implemented in your cache class")
+    def put(self, key, item, ttl=None):
+        """Add an item in the cache, for ttl seconds if given"""
+        if key is None or item is None:
+            return
+        if ttl is None:
+            ttl = self.ttl
+        if self.wheel is not None:
+            self.reap()
+        if self.expiries and self._has_expired(key):
+            self._expire(key)
+        weight = 0
+        if self.max_bytes is not None:
+            weight = self.sizer(key, item)
+            if weight > self.max_bytes:
+                # Could never fit, even in an empty cache
+                if key in self.cache_data:
+                    self._forget(key)
+                    self._discard(key)
+                return
+        if key in self.cache_data:
+            self.counters.updates += 1
+            self.cache_data[key] = item
+            self._record_update(key)
+            self._set_expiry(key, ttl)
+            if self.max_bytes is not None:
+                self.total_bytes += weight - self.weights[key]
+                self.weights[key] = weight
+                self._make_room(0, 0)
+            return
+        self.counters.puts += 1
+        self._make_room(1, weight)
+        self.cache_data[key] = item
+        if self.max_bytes is not None:
+            self.weights[key] = weight
+            self.total_bytes += weight
+        self._record_insert(key)
+        self._set_expiry(key, ttl)
 
     def get(self, key):
         """Get an item by key"""
-        raise NotImplementedError("get must be implemented in your cache class")
+        if key is None or key not in self.cache_data:
+            self.counters.misses += 1
+            return None
+        if self.expiries and self._has_expired(key):
+            self._expire(key)
+            self.counters.misses += 1
+            return None
+        self.counters.hits += 1
+        self._record_access(key)
+        return self.cache_data[key]
+
+    def delete(self, key):
+        """Remove an item by key and return it"""
+        if key is None or key not in self.cache_data:
+            return None
+        item = self.cache_data[key]
+        self._forget(key)
+        self._discard(key, EXPLICIT)
+        return item
+
+    def get_many(self, keys):
+        """Dict of the items cached for keys, counted as one batch"""
+        found = {}
+        hits = misses = 0
+        cache_data = self.cache_data
+        record_access = self._record_access
+        now = self.clock() if self.expiries else None
+        for key in keys:
+            if key is None or key not in cache_data:
+                misses += 1
+                continue
+            if now is not None:
+                deadline = self.expiries.get(key)
+                if deadline is not None and deadline <= now:
+                    self._expire(key)
+                    misses += 1
+                    continue
+            hits += 1
+            record_access(key)
+            found[key] = cache_data[key]
+        self.counters.hits += hits
+        self.counters.misses += misses
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """
+        Add every item of a dict in the cache, for ttl seconds if given,
+        making room for the new keys in a single eviction pass before
+        writing any of them
+        """
+        if ttl is None:
+            ttl = self.ttl
+        if self.wheel is not None:
+            self.reap()
+        cache_data = self.cache_data
+        weights = self.weights
+        sizer = self.sizer if self.max_bytes is not None else None
+        now = self.clock() if self.expiries else None
+        batch = {}
+        count = 0
+        weight_in = weight_all = 0
+        for key, item in mapping.items():
+            if key is None or item is None:
+                continue
+            if now is not None and key in cache_data:
+                deadline = self.expiries.get(key)
+                if deadline is not None and deadline <= now:
+                    self._expire(key)
+            weight = 0 if sizer is None else sizer(key, item)
+            if sizer is not None and weight > self.max_bytes:
+                # Could never fit, as in put
+                if key in cache_data:
+                    self._forget(key)
+                    self._discard(key)
+                continue
+            batch[key] = (item, weight)
+            weight_all += weight
+            if key not in cache_data:
+                count += 1
+                weight_in += weight
+            elif sizer is not None:
+                weight_in += weight - weights[key]
+        if len(batch) > self.MAX_ITEMS or (
+                sizer is not None and weight_all > self.max_bytes):
+            # The batch would evict itself, as sequential puts do
+            for key, item in mapping.items():
+                self.put(key, item, ttl)
+            return
+        while cache_data and self._is_full(count, weight_in):
+            victim = self._pop_victim()
+            if victim in batch:
+                # Put back as a new key once the room is made
+                count += 1
+                if sizer is not None:
+                    weight_in += weights[victim]
+            self._discard(victim)
+        for key, (item, weight) in batch.items():
+            if key in cache_data:
+                self.counters.updates += 1
+                cache_data[key] = item
+                self._record_update(key)
+                if sizer is not None:
+                    self.total_bytes += weight - weights[key]
+            else:
+                self.counters.puts += 1
+                cache_data[key] = item
+                if sizer is not None:
+                    self.total_bytes += weight
+                self._record_insert(key)
+            if sizer is not None:
+                weights[key] = weight
+            self._set_expiry(key, ttl)
+
+    def delete_many(self, keys):
+        """Remove items by key and return how many were removed"""
+        removed = 0
+        for key in keys:
+            if key is not None and key in self.cache_data:
+                self._forget(key)
+                self._discard(key, EXPLICIT)
+                removed += 1
+        return removed
+
+    def stats(self):
+        """Snapshot of the counters and of the size of the cache"""
+        stats = self.counters.snapshot()
+        stats['size'] = len(self.cache_data)
+        stats['bytes'] = self.total_bytes
+        return stats
+
+    def reset_stats(self):
+        """Set the counters back to zero"""
+        self.counters.reset()
+
+    def dump_entries(self):
+        """
+        Yield (key, item, meta, ttl) for every live entry, in the order
+        restore_entry needs them to rebuild the state of the policy
+        """
+        now = self.clock()
+        for key in self._ordered_keys():
+            deadline = self.expiries.get(key)
+            ttl = None if deadline is None else deadline - now
+            if ttl is None or ttl > 0:
+                yield key, self.cache_data[key], self._key_meta(key), ttl
+
+    def restore_entry(self, key, item, meta=None, ttl=None):
+        """Put back an entry yielded by dump_entries"""
+        self.put(key, item, ttl)
+        if meta is not None and key in self.cache_data:
+            self._restore_meta(key, meta)
+
+    def reap(self):
+        """Remove the expired items and return how many were removed"""
+        if self.wheel is None:
+            return 0
+        expired = self.wheel.advance(self.clock())
+        for key in expired:
+            self._expire(key)
+        return len(expired)
+
+    def _has_expired(self, key):
+        """Tell if the deadline of a key has passed"""
+        deadline = self.expiries.get(key)
+        return deadline is not None and deadline <= self.clock()
+
+    def _expire(self, key):
+        """Remove an expired key from the cache"""
+        self._forget(key)
+        self._discard(key, EXPIRED)
+
+    def _set_expiry(self, key, ttl):
+        """Schedule a key to expire in ttl seconds, or never if None"""
+        if ttl is None:
+            if self.expiries.pop(key, None) is not None:
+                self.wheel.cancel(key)
+            return
+        now = self.clock()
+        if self.wheel is None:
+            self.wheel = TimerWheel(now=now)
+        self.expiries[key] = now + ttl
+        self.wheel.schedule(key, now + ttl)
+
+    def _is_full(self, count, weight):
+        """Tell if count more entries weighing weight would not fit"""
+        if len(self.cache_data) + count > self.MAX_ITEMS:
+            return True
+        return (self.max_bytes is not None and
+                self.total_bytes + weight > self.max_bytes)
+
+    def _make_room(self, count, weight):
+        """Evict entries until count more entries weighing weight fit"""
+        while self.cache_data and self._is_full(count, weight):
+            self._discard(self._pop_victim())
+
+    def _discard(self, key, reason=CAPACITY):
+        """Remove a key the policy forgot from the cache"""
+        item = self.cache_data.pop(key)
+        if self.max_bytes is not None:
+            self.total_bytes -= self.weights.pop(key)
+        if self.expiries and self.expiries.pop(key, None) is not None:
+            self.wheel.cancel(key)
+        evictions = self.counters.evictions
+        evictions[reason] = evictions.get(reason, 0) + 1
+        if self.listener is not None:
+            self.listener(key, item, reason)
+
+    def _record_insert(self, key):
+        """Track a key newly added to the cache"""
+
+    def _record_access(self, key):
+        """Track a cache hit on a key"""
+
+    def _record_update(self, key):
+        """Track a new item put under an existing key"""
+        self._record_access(key)
+
+    def _pop_victim(self):
+        """Forget and return the key the policy evicts next"""
+        raise NotImplementedError(
+            "_pop_victim must be implemented in your cache class")
+
+    def _forget(self, key):
+        """Stop tracking a key removed from the cache"""
+        raise NotImplementedError(
+            "_forget must be implemented in your cache class")
+
+    def _ordered_keys(self):
+        """Keys in the order they must be put back in the cache"""
+        return list(self.cache_data)
+
+    def _key_meta(self, key):
+        """State of a key the policy needs besides its order"""
+        return None
+
+    def _restore_meta(self, key, meta):
+        """Restore the state of a key put back in the cache"""
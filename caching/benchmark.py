@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+'''
+Benchmark of the caching policies
+
+Replays synthetic traces through every policy found in this directory,
+for several capacities, a get followed by a put on every miss, and
+prints the throughput, p50 and p99 latency per operation, hit ratio
+and peak memory of each run.
+'''
+
+
+import argparse
+import glob
+import os
+import time
+import tracemalloc
+
+from base_caching import BaseCaching
+import traces
+
+
+def find_policies(directory=None):
+    '''Name and class of every BaseCaching subclass of the numbered
+    N-*_cache.py policy modules of the directory, in task order'''
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    policies = []
+    names = [os.path.basename(path)[:-3] for path in
+             glob.glob(os.path.join(directory, '[0-9]*-*_cache.py'))]
+    for name in sorted(names, key=lambda name: int(name.split('-')[0])):
+        module = __import__(name)
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, BaseCaching)
+                    and value is not BaseCaching and
+                    value.__module__ == module.__name__):
+                policies.append((value.__name__, value))
+    return policies
+
+
+def replay(cache, trace):
+    '''Replay a trace, return the latency of every access in ns'''
+    clock = time.perf_counter_ns
+    latencies = []
+    for key in trace:
+        start = clock()
+        if cache.get(key) is None:
+            cache.put(key, key)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def peak_memory(policy, capacity, trace):
+    '''Peak bytes allocated while replaying a trace'''
+    tracemalloc.start()
+    cache = policy(max_items=capacity, listener=None)
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(policy, capacity, trace):
+    '''Measures of a policy replaying a trace'''
+    cache = policy(max_items=capacity, listener=None)
+    start = time.perf_counter()
+    latencies = replay(cache, trace)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'ops_per_sec': len(trace) / elapsed if elapsed else 0.0,
+        'p50_ns': latencies[len(latencies) // 2],
+        'p99_ns': latencies[min(len(latencies) * 99 // 100,
+                                len(latencies) - 1)],
+        'hit_ratio': cache.stats()['hit_ratio'],
+        'peak_bytes': peak_memory(policy, capacity, trace),
+    }
+
+
+def main():
+    '''Parse the arguments and print one line per run'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--policies', nargs='*',
+                        help='class names to benchmark, all by default')
+    parser.add_argument('--capacities', nargs='*', type=int,
+                        default=[100, 1000, 5000])
+    parser.add_argument('--length', type=int, default=100000)
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    policies = find_policies()
+    if args.policies:
+        policies = [(name, policy) for name, policy in policies
+                    if name in args.policies]
+    print('{:<10} {:<14} {:>8} {:>12} {:>8} {:>8} {:>9} {:>12}'.format(
+        'trace', 'policy', 'capacity', 'ops/sec', 'p50 ns', 'p99 ns',
+        'hit ratio', 'peak bytes'))
+    for trace_name, trace in traces.standard_traces(
+            args.length, args.keys, args.seed):
+        for capacity in args.capacities:
+            for name, policy in policies:
+                result = run(policy, capacity, trace)
+                print('{:<10} {:<14} {:>8} {:>12.0f} {:>8} {:>8} {:>9.4f}'
+                      ' {:>12}'.format(
+                          trace_name, name, capacity,
+                          result['ops_per_sec'], result['p50_ns'],
+                          result['p99_ns'], result['hit_ratio'],
+                          result['peak_bytes']))
+
+
+if __name__ == '__main__':
+    main()
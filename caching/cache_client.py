@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+'''CacheClient module'''
+
+
+import socket
+
+CRLF = b'\r\n'
+
+
+class ResponseError(Exception):
+    '''An error reply of the server'''
+
+
+def encode_command(*arguments):
+    '''RESP encoding of a command'''
+    parts = [b'*%d\r\n' % len(arguments)]
+    for argument in arguments:
+        if isinstance(argument, str):
+            argument = argument.encode()
+        elif not isinstance(argument, (bytes, bytearray)):
+            argument = str(argument).encode()
+        parts.append(b'$%d\r\n' % len(argument))
+        parts.append(bytes(argument))
+        parts.append(CRLF)
+    return b''.join(parts)
+
+
+def read_reply(stream):
+    '''Read a reply, an error reply is returned as a ResponseError'''
+    line = stream.readline()
+    if not line.endswith(CRLF):
+        raise ConnectionError("connection closed by the server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b'+':
+        return body.decode()
+    if kind == b'-':
+        return ResponseError(body.decode())
+    if kind == b':':
+        return int(body)
+    if kind == b'$':
+        length = int(body)
+        if length < 0:
+            return None
+        return stream.read(length + 2)[:-2]
+    if kind == b'*':
+        length = int(body)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise ConnectionError("unknown reply {!r}".format(line))
+
+
+def parse_info(text):
+    '''Dict of the fields of an INFO reply'''
+    info = {}
+    for line in text.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, _, value = line.partition(':')
+            for kind in (int, float):
+                try:
+                    value = kind(value)
+                    break
+                except ValueError:
+                    pass
+            info[name] = value
+    return info
+
+
+def hits(keys, items):
+    '''Dict of the keys found by MGET'''
+    return {key: item for key, item in zip(keys, items) if item is not None}
+
+
+class Commands:
+    '''Commands shared by CacheClient and Pipeline'''
+
+    def _command(self, convert, *arguments):
+        '''Send a command whose reply goes through convert'''
+        raise NotImplementedError("_command must be implemented")
+
+    def get(self, key):
+        '''Get an item by key, as bytes'''
+        return self._command(None, 'GET', key)
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in the cache, expiring after ttl seconds'''
+        if ttl is None:
+            return self._command(None, 'SET', key, item)
+        return self._command(None, 'SET', key, item, 'EX', ttl)
+
+    def delete(self, key):
+        '''Remove an item by key, tell if it was cached'''
+        return self._command(bool, 'DEL', key)
+
+    def get_many(self, keys):
+        '''Dict of the items cached for keys'''
+        keys = list(keys)
+        if not keys:
+            return self._command(lambda reply: {}, 'PING')
+        return self._command(lambda items: hits(keys, items), 'MGET', *keys)
+
+    def _commands(self, commands):
+        '''Send (convert, arguments) commands'''
+        raise NotImplementedError("_commands must be implemented")
+
+    def put_many(self, mapping, ttl=None):
+        '''
+        Add every item of a dict in the cache, expiring after ttl
+        seconds, with a single MSET or pipelined SETs if ttl is given
+        '''
+        if ttl is not None and mapping:
+            return self._commands([(None, ('SET', key, item, 'EX', ttl))
+                                   for key, item in mapping.items()])
+        arguments = [part for pair in mapping.items() for part in pair]
+        if not arguments:
+            return self._command(None, 'PING')
+        return self._command(None, 'MSET', *arguments)
+
+    def delete_many(self, keys):
+        '''Remove items by key, return how many were cached'''
+        keys = list(keys)
+        if not keys:
+            return self._command(lambda reply: 0, 'PING')
+        return self._command(None, 'DEL', *keys)
+
+    def info(self):
+        '''Statistics of the cache'''
+        return self._command(parse_info, 'INFO')
+
+
+class CacheClient(Commands):
+    '''
+    CacheClient is a thin client of a CacheServer, or of any server
+    speaking RESP. Every command waits for its reply; pipeline() batches
+    commands into a single round trip.
+    '''
+
+    def __init__(self, host='127.0.0.1', port=6380, timeout=None):
+        '''Initialize CacheClient and connect to the server'''
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile('rb')
+
+    def _command(self, convert, *arguments):
+        '''Send a command and return its reply'''
+        return self.execute([(convert, arguments)])[0]
+
+    def _commands(self, commands):
+        '''Send commands at once and return their replies'''
+        return self.execute(commands)
+
+    def execute(self, commands):
+        '''
+        Send (convert, arguments) commands at once and return their
+        replies, raising the first error reply once all are read
+        '''
+        self.sock.sendall(b''.join(encode_command(*arguments)
+                                   for _, arguments in commands))
+        replies = [read_reply(self.stream) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, ResponseError):
+                raise reply
+        return [reply if convert is None else convert(reply)
+                for (convert, _), reply in zip(commands, replies)]
+
+    def pipeline(self):
+        '''Pipeline of commands sent on execute()'''
+        return Pipeline(self)
+
+    def close(self):
+        '''Close the connection'''
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        '''Use the client as a context manager'''
+        return self
+
+    def __exit__(self, *exc_info):
+        '''Close the connection'''
+        self.close()
+
+
+class Pipeline(Commands):
+    '''
+    Pipeline queues the commands of a CacheClient and sends them in a
+    single write on execute(), which returns their replies in order.
+    '''
+
+    def __init__(self, client):
+        '''Initialize Pipeline'''
+        self.client = client
+        self.commands = []
+
+    def _command(self, convert, *arguments):
+        '''Queue a command'''
+        self.commands.append((convert, arguments))
+        return self
+
+    def _commands(self, commands):
+        '''Queue commands'''
+        self.commands.extend(commands)
+        return self
+
+    def execute(self):
+        '''Send the queued commands and return their replies'''
+        commands, self.commands = self.commands, []
+        if not commands:
+            return []
+        return self.client.execute(commands)
+
+    def __enter__(self):
+        '''Use the pipeline as a context manager'''
+        return self
+
+    def __exit__(self, *exc_info):
+        '''Drop the commands not executed'''
+        self.commands = []
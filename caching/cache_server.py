@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+'''
+Cache server speaking a subset of the Redis protocol (RESP)
+
+Serves a caching policy over TCP to any Redis client: GET, SET with
+EX, DEL, MGET, MSET, INFO, PING and QUIT. Pipelined commands are
+answered in order as soon as each is read.
+'''
+
+
+import argparse
+import asyncio
+
+from benchmark import find_policies
+
+CRLF = b'\r\n'
+# Bounds of a request, the defaults of Redis
+MAX_ARGUMENTS = 1024 * 1024
+MAX_BULK_LENGTH = 512 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    '''A request which is not valid RESP'''
+
+
+class Status:
+    '''A simple string reply, like OK or PONG'''
+
+    def __init__(self, text):
+        '''Initialize Status'''
+        self.text = text
+
+
+OK = Status('OK')
+
+
+def encode(reply):
+    '''RESP encoding of a reply'''
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, Status):
+        return b'+' + reply.text.encode() + CRLF
+    if isinstance(reply, Exception):
+        return b'-ERR ' + str(reply).encode() + CRLF
+    if isinstance(reply, list):
+        return b'*%d\r\n' % len(reply) + b''.join(map(encode, reply))
+    if isinstance(reply, str):
+        reply = reply.encode()
+    return b'$%d\r\n' % len(reply) + reply + CRLF
+
+
+async def read_command(reader):
+    '''Arguments of the next command as bytes, None at the end'''
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.endswith(CRLF):
+        raise ProtocolError("unterminated line")
+    if not line.startswith(b'*'):
+        # Inline command, as typed in telnet
+        return line.split()
+    try:
+        count = int(line[1:-2])
+    except ValueError:
+        count = -1
+    if not 0 <= count <= MAX_ARGUMENTS:
+        raise ProtocolError("invalid multibulk length")
+    arguments = []
+    for _ in range(count):
+        header = await reader.readline()
+        if not header.startswith(b'$'):
+            raise ProtocolError("expected a bulk string")
+        try:
+            length = int(header[1:-2])
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BULK_LENGTH:
+            raise ProtocolError("invalid bulk length")
+        data = await reader.readexactly(length + 2)
+        arguments.append(data[:-2])
+    return arguments
+
+
+class CacheServer:
+    '''
+    CacheServer serves a cache (any BaseCaching or ShardedCache) to
+    Redis clients. Keys are stored as strings and values as bytes.
+    '''
+
+    def __init__(self, cache, host='127.0.0.1', port=6380):
+        '''Initialize CacheServer'''
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self.server = None
+        # Method, minimum and maximum (None if unbounded) arguments
+        self.commands = {
+            b'GET': (self.get, 1, 1),
+            b'SET': (self.set, 2, 4),
+            b'DEL': (self.delete, 1, None),
+            b'MGET': (self.mget, 1, None),
+            b'MSET': (self.mset, 2, None),
+            b'INFO': (self.info, 0, None),
+            b'PING': (self.ping, 0, 1),
+        }
+
+    async def start(self):
+        '''Start listening, return the asyncio server'''
+        self.server = await asyncio.start_server(self.handle, self.host,
+                                                 self.port)
+        return self.server
+
+    async def serve_forever(self):
+        '''Listen until cancelled'''
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader, writer):
+        '''Answer the commands of a connection until it closes'''
+        try:
+            while True:
+                try:
+                    arguments = await read_command(reader)
+                except (ProtocolError, asyncio.IncompleteReadError) as error:
+                    writer.write(encode(ProtocolError(
+                        "Protocol error: {}".format(error))))
+                    break
+                if arguments is None:
+                    break
+                if not arguments:
+                    continue
+                name = arguments[0].upper()
+                if name == b'QUIT':
+                    writer.write(encode(OK))
+                    break
+                writer.write(encode(self.execute(name, arguments[1:])))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def execute(self, name, arguments):
+        '''Reply to a command'''
+        if name not in self.commands:
+            return ValueError("unknown command '{}'".format(
+                name.decode(errors='replace')))
+        command, minimum, maximum = self.commands[name]
+        if len(arguments) < minimum or (
+                maximum is not None and len(arguments) > maximum):
+            return ValueError("wrong number of arguments for '{}'".format(
+                name.decode().lower()))
+        return command(*arguments)
+
+    @staticmethod
+    def key(data):
+        '''Cache key of a key sent by a client'''
+        return data.decode('utf-8', 'surrogateescape')
+
+    def get(self, key):
+        '''GET key'''
+        return self.cache.get(self.key(key))
+
+    def set(self, key, value, *options):
+        '''SET key value [EX seconds]'''
+        ttl = None
+        if options:
+            if len(options) != 2 or options[0].upper() != b'EX':
+                return ValueError("syntax error")
+            try:
+                ttl = int(options[1])
+            except ValueError:
+                return ValueError("value is not an integer or out of range")
+            if ttl <= 0:
+                return ValueError("invalid expire time in 'set' command")
+        self.cache.put(self.key(key), bytes(value), ttl)
+        return OK
+
+    def delete(self, key, *keys):
+        '''DEL key [key ...]'''
+        return self.cache.delete_many([self.key(data)
+                                       for data in (key,) + keys])
+
+    def mget(self, key, *keys):
+        '''MGET key [key ...]'''
+        keys = [self.key(data) for data in (key,) + keys]
+        found = self.cache.get_many(keys)
+        return [found.get(key) for key in keys]
+
+    def mset(self, key, value, *pairs):
+        '''MSET key value [key value ...]'''
+        if len(pairs) % 2:
+            return ValueError("wrong number of arguments for 'mset'")
+        pairs = (key, value) + pairs
+        self.cache.put_many({self.key(pairs[index]): bytes(pairs[index + 1])
+                             for index in range(0, len(pairs), 2)})
+        return OK
+
+    def info(self, *sections):
+        '''INFO, the statistics of the cache'''
+        lines = ['# Stats']
+        for name, value in sorted(self.cache.stats().items()):
+            if isinstance(value, dict):
+                value = ','.join('{}={}'.format(*item)
+                                 for item in sorted(value.items()))
+            lines.append('{}:{}'.format(name, value))
+        return '\r\n'.join(lines) + '\r\n'
+
+    def ping(self, message=None):
+        '''PING [message]'''
+        return Status('PONG') if message is None else message
+
+
+def main():
+    '''Parse the arguments and serve a cache'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--policy', default='LRUCache')
+    parser.add_argument('--max-items', type=int, default=10000)
+    parser.add_argument('--max-bytes', type=int)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6380)
+    args = parser.parse_args()
+
+    policies = dict(find_policies())
+    if args.policy not in policies:
+        parser.error('policy must be one of {}'.format(
+            ', '.join(policies)))
+    cache = policies[args.policy](max_items=args.max_items,
+                                  max_bytes=args.max_bytes, listener=None)
+    try:
+        asyncio.run(CacheServer(cache, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+'''CacheStats module'''
+
+
+import time
+
+
+class LatencyHistogram:
+    '''
+    Histogram of latencies in nanoseconds, with one bucket per power
+    of 2 so recording is a single increment and percentiles are exact
+    to a factor of 2.
+    '''
+
+    def __init__(self):
+        '''Initialize LatencyHistogram'''
+        self.reset()
+
+    def reset(self):
+        '''Forget every latency recorded'''
+        self.counts = [0] * 64
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        '''Add a latency in nanoseconds'''
+        self.counts[min(ns.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p):
+        '''Upper bound of the bucket holding the p-th percentile'''
+        if self.count == 0:
+            return 0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(2 ** index - 1, self.max)
+        return self.max
+
+    def merge(self, other):
+        '''Add the latencies of another histogram to this one'''
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def snapshot(self):
+        '''Summary of the histogram as a dictionary'''
+        return {
+            'count': self.count,
+            'mean_ns': self.total // self.count if self.count else 0,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max,
+        }
+
+
+class CacheStats:
+    '''
+    Counters of a cache: hits, misses, puts of new keys, updates of
+    existing keys and evictions by reason, plus optional get and put
+    latency histograms.
+    '''
+
+    def __init__(self, latency=False):
+        '''Initialize CacheStats'''
+        self.get_latency = LatencyHistogram() if latency else None
+        self.put_latency = LatencyHistogram() if latency else None
+        self.reset()
+
+    def reset(self):
+        '''Set every counter back to zero'''
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.updates = 0
+        self.evictions = {}
+        if self.get_latency is not None:
+            self.get_latency.reset()
+            self.put_latency.reset()
+
+    def merge(self, other):
+        '''Add the counters of another CacheStats to these ones'''
+        self.hits += other.hits
+        self.misses += other.misses
+        self.puts += other.puts
+        self.updates += other.updates
+        for reason, count in other.evictions.items():
+            self.evictions[reason] = self.evictions.get(reason, 0) + count
+        if other.get_latency is not None:
+            if self.get_latency is None:
+                self.get_latency = LatencyHistogram()
+                self.put_latency = LatencyHistogram()
+            self.get_latency.merge(other.get_latency)
+            self.put_latency.merge(other.put_latency)
+
+    def snapshot(self):
+        '''Counters as a dictionary'''
+        lookups = self.hits + self.misses
+        snapshot = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'puts': self.puts,
+            'updates': self.updates,
+            'evictions': dict(self.evictions),
+        }
+        if self.get_latency is not None:
+            snapshot['get_latency'] = self.get_latency.snapshot()
+            snapshot['put_latency'] = self.put_latency.snapshot()
+        return snapshot
+
+
+def timed(method, histogram):
+    '''Wrap a method to record its latency in a histogram'''
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        '''Call the method and time it'''
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.record(clock() - start)
+    return wrapper
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+'''CountMinSketch module'''
+
+
+# Odd 64 bit multipliers, one per row of the sketch
+SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+         0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+MASK = 0xFFFFFFFFFFFFFFFF
+MAX_COUNT = 15
+# Halves every counter of a bytearray through bytearray.translate
+HALVE = bytes(count >> 1 for count in range(256))
+
+
+class CountMinSketch:
+    '''
+    Approximate frequency of keys in 4 rows of small saturating
+    counters. The frequency of a key is the minimum of its counters,
+    which can only overestimate it. Once sample_size increments were
+    recorded every counter is halved, so old popularity fades away.
+    '''
+
+    def __init__(self, capacity, sample_size=None):
+        '''Initialize CountMinSketch for about capacity distinct keys'''
+        self.width = 1
+        while self.width < capacity:
+            self.width *= 2
+        self.table = bytearray(self.width * len(SEEDS))
+        self.sample_size = sample_size or 10 * max(capacity, 1)
+        self.additions = 0
+
+    def _indexes(self, key):
+        '''Index of the counter of a key in every row'''
+        h = hash(key)
+        return [row * self.width + ((((h * seed) & MASK) >> 32) &
+                                    (self.width - 1))
+                for row, seed in enumerate(SEEDS)]
+
+    def frequency(self, key):
+        '''Estimated number of increments of a key'''
+        table = self.table
+        return min(table[i] for i in self._indexes(key))
+
+    def increment(self, key):
+        '''Count one more occurrence of a key'''
+        table = self.table
+        for i in self._indexes(key):
+            if table[i] < MAX_COUNT:
+                table[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def reset(self):
+        '''Age the sketch by halving every counter'''
+        self.table = self.table.translate(HALVE)
+        self.additions //= 2
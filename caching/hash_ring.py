@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+'''HashRing module'''
+
+
+import bisect
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def ring_hash(data):
+    '''Position of some bytes on the ring, the same in every process'''
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          'big')
+
+
+def key_bytes(key):
+    '''Bytes of a key, as a CacheClient would send it'''
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key)
+    return str(key).encode()
+
+
+class HashRing:
+    '''
+    HashRing spreads keys over several cache nodes with consistent
+    hashing. A node is any object with get, put and delete: a
+    BaseCaching policy, a ShardedCache or a CacheClient of a server.
+
+    Every node is placed at vnodes points of the ring and owns the keys
+    hashing between its points and the previous ones, so adding or
+    removing one of N nodes moves only about 1/N of the keys. Nodes can
+    be added and removed while other threads use the ring. Each node
+    has its own lock, and get_many, put_many and delete_many send their
+    keys to the nodes in parallel, in one batch per node.
+    '''
+
+    VNODES = 160
+
+    def __init__(self, nodes=None, vnodes=None, workers=8):
+        '''Initialize HashRing with a dict of nodes by name'''
+        self.vnodes = self.VNODES if vnodes is None else vnodes
+        if self.vnodes < 1:
+            raise ValueError("vnodes must be at least 1")
+        self.nodes = {}
+        # Sorted points and the (name, node, lock) owning each, replaced
+        # as a whole so readers never see them out of sync
+        self.ring = ([], [])
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(workers)
+        for name, node in (nodes or {}).items():
+            self.add_node(name, node)
+
+    def _points(self, name):
+        '''Points of a node on the ring'''
+        return [ring_hash('{}#{}'.format(name, index).encode())
+                for index in range(self.vnodes)]
+
+    def _replace(self, entries, nodes):
+        '''Publish new (point, member) entries and nodes'''
+        entries.sort(key=lambda entry: entry[0])
+        self.ring = ([point for point, _ in entries],
+                     [member for _, member in entries])
+        self.nodes = nodes
+
+    def add_node(self, name, node):
+        '''Add a node, which takes over about 1/N of the keys'''
+        with self.lock:
+            if name in self.nodes:
+                raise ValueError("node {} already exists".format(name))
+            member = (name, node, threading.Lock())
+            entries = list(zip(*self.ring))
+            entries.extend((point, member) for point in self._points(name))
+            nodes = dict(self.nodes)
+            nodes[name] = node
+            self._replace(entries, nodes)
+
+    def remove_node(self, name):
+        '''Remove a node and return it; its keys go to the others'''
+        with self.lock:
+            nodes = dict(self.nodes)
+            node = nodes.pop(name)
+            entries = [(point, member) for point, member in zip(*self.ring)
+                       if member[0] != name]
+            self._replace(entries, nodes)
+            return node
+
+    def _member(self, key, ring=None):
+        '''(name, node, lock) of the node owning a key'''
+        points, owners = self.ring if ring is None else ring
+        if not points:
+            raise LookupError("the ring has no node")
+        index = bisect.bisect(points, ring_hash(key_bytes(key)))
+        return owners[index % len(owners)]
+
+    def node_name(self, key):
+        '''Name of the node owning a key'''
+        return self._member(key)[0]
+
+    def _group(self, keys):
+        '''Keys grouped by node, as {name: (member, keys)}'''
+        ring = self.ring
+        groups = {}
+        for key in keys:
+            member = self._member(key, ring)
+            groups.setdefault(member[0], (member, []))[1].append(key)
+        return groups
+
+    def _fan_out(self, function, groups):
+        '''Call function(member, group) for every group in parallel'''
+        if len(groups) == 1:
+            return [function(*next(iter(groups.values())))]
+        futures = [self.executor.submit(function, member, group)
+                   for member, group in groups.values()]
+        return [future.result() for future in futures]
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in the node owning its key'''
+        if key is None or item is None:
+            return
+        _, node, lock = self._member(key)
+        with lock:
+            node.put(key, item, ttl)
+
+    def get(self, key):
+        '''Get an item from the node owning its key'''
+        if key is None:
+            return None
+        _, node, lock = self._member(key)
+        with lock:
+            return node.get(key)
+
+    def delete(self, key):
+        '''Remove an item from the node owning its key'''
+        if key is None:
+            return None
+        _, node, lock = self._member(key)
+        with lock:
+            return node.delete(key)
+
+    def get_many(self, keys):
+        '''Dict of the items cached for keys, asking nodes in parallel'''
+        groups = self._group(key for key in keys if key is not None)
+        found = {}
+        for hits in self._fan_out(self._get_group, groups):
+            found.update(hits)
+        return found
+
+    @staticmethod
+    def _get_group(member, keys):
+        '''Items cached for keys in a node'''
+        _, node, lock = member
+        with lock:
+            if hasattr(node, 'get_many'):
+                return node.get_many(keys)
+            hits = {}
+            for key in keys:
+                item = node.get(key)
+                if item is not None:
+                    hits[key] = item
+            return hits
+
+    def put_many(self, mapping, ttl=None):
+        '''
+        Add every item of a dict, for ttl seconds if given, in parallel
+        over the nodes
+        '''
+        groups = self._group(key for key, item in mapping.items()
+                             if key is not None and item is not None)
+
+        def put_group(member, keys):
+            '''Add the items of keys in a node'''
+            _, node, lock = member
+            items = {key: mapping[key] for key in keys}
+            with lock:
+                if hasattr(node, 'put_many'):
+                    node.put_many(items, ttl)
+                    return
+                for key, item in items.items():
+                    node.put(key, item, ttl)
+        self._fan_out(put_group, groups)
+
+    def delete_many(self, keys):
+        '''Remove items by key, return how many were cached'''
+        groups = self._group(key for key in keys if key is not None)
+        return sum(self._fan_out(self._delete_group, groups))
+
+    @staticmethod
+    def _delete_group(member, keys):
+        '''Remove items by key from a node, return how many were cached'''
+        _, node, lock = member
+        with lock:
+            if hasattr(node, 'delete_many'):
+                return node.delete_many(keys)
+            # CacheClient.delete returns a bool, policies the item
+            return sum(item is not None and item is not False
+                       for item in map(node.delete, keys))
+
+    def close(self):
+        '''Stop the threads of the ring'''
+        self.executor.shutdown()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+'''Doubly linked list module used to order cache keys'''
+
+
+class Node:
+    '''A node of a DoublyLinkedList holding a cache key'''
+
+    __slots__ = ('key', 'prev', 'next')
+
+    def __init__(self, key=None):
+        '''Initialize Node'''
+        self.key = key
+        self.prev = None
+        self.next = None
+
+
+class DoublyLinkedList:
+    '''
+    Circular doubly linked list with a sentinel node.
+    The head (sentinel.next) is the oldest node and the tail
+    (sentinel.prev) is the newest one; every operation is O(1).
+    '''
+
+    def __init__(self):
+        '''Initialize DoublyLinkedList'''
+        self.sentinel = Node()
+        self.sentinel.prev = self.sentinel
+        self.sentinel.next = self.sentinel
+        self.size = 0
+
+    def __len__(self):
+        '''Number of nodes in the list'''
+        return self.size
+
+    def __iter__(self):
+        '''Iterate over the keys from head to tail'''
+        node = self.sentinel.next
+        while node is not self.sentinel:
+            yield node.key
+            node = node.next
+
+    def insert_after(self, anchor, node):
+        '''Link a node right after a linked node or the sentinel'''
+        node.prev = anchor
+        node.next = anchor.next
+        anchor.next.prev = node
+        anchor.next = node
+        self.size += 1
+        return node
+
+    def append(self, node):
+        '''Link a node at the tail of the list'''
+        return self.insert_after(self.sentinel.prev, node)
+
+    def unlink(self, node):
+        '''Remove a node from the list'''
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node.prev = None
+        node.next = None
+        self.size -= 1
+        return node
+
+    def move_to_tail(self, node):
+        '''Move a linked node to the tail of the list'''
+        if node is not self.sentinel.prev:
+            self.unlink(node)
+            self.append(node)
+
+    def head(self):
+        '''Return the head node or None when the list is empty'''
+        if self.size == 0:
+            return None
+        return self.sentinel.next
+
+    def tail(self):
+        '''Return the tail node or None when the list is empty'''
+        if self.size == 0:
+            return None
+        return self.sentinel.prev
+
+    def pop_head(self):
+        '''Unlink and return the head node'''
+        return self.unlink(self.sentinel.next)
+
+    def pop_tail(self):
+        '''Unlink and return the tail node'''
+        return self.unlink(self.sentinel.prev)
+
+
+class KeyedLists:
+    '''
+    Index of keys spread over several DoublyLinkedLists, each key in
+    one list at most, to move keys between lists in O(1)
+    '''
+
+    def __init__(self):
+        '''Initialize KeyedLists'''
+        self.nodes = {}
+        self.lists = {}
+
+    def __len__(self):
+        '''Number of keys in the lists'''
+        return len(self.lists)
+
+    def __contains__(self, key):
+        '''Tell if a key is in one of the lists'''
+        return key in self.lists
+
+    def list_of(self, key):
+        '''List holding a key, or None'''
+        return self.lists.get(key)
+
+    def link(self, key, target):
+        '''Move a key to the tail of a list'''
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Node(key)
+        else:
+            self.lists[key].unlink(node)
+        target.append(node)
+        self.lists[key] = target
+
+    def unlink(self, key):
+        '''Remove a key from its list'''
+        self.lists.pop(key).unlink(self.nodes.pop(key))
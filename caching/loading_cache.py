@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+'''LoadingCache module'''
+
+
+import math
+import random
+import threading
+import time
+
+from base_caching import default_sizer
+from sharded_cache import ShardedCache
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+class Call:
+    '''A load in flight, shared by every thread missing the same key'''
+
+    def __init__(self):
+        '''Initialize Call'''
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self):
+        '''Wait for the load and return its value or raise its error'''
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Entry:
+    '''A cached item with the time to refresh it and its load time'''
+
+    __slots__ = ('value', 'refresh_at', 'delta')
+
+    def __init__(self, value, refresh_at, delta):
+        '''Initialize Entry'''
+        self.value = value
+        self.refresh_at = refresh_at
+        self.delta = delta
+
+    def __str__(self):
+        '''String of the cached item'''
+        return str(self.value)
+
+
+def value_sizer(sizer):
+    '''Sizer weighing the item of an Entry, instead of the Entry'''
+    def size(key, entry):
+        '''Weight of the item of an entry'''
+        return sizer(key, entry.value)
+    return size
+
+
+class LoadingCache:
+    '''
+    LoadingCache is a thread safe read through caching system: get
+    calls loader(key) on a miss and caches its result. Concurrent misses
+    on the same key share a single call of the loader, and its result or
+    exception. None results and exceptions are not cached, nor are the
+    results of loads overtaken by a put or a delete of their key.
+
+    Items older than refresh_after seconds are stale: get still returns
+    them at once while a background thread reloads them, until the hard
+    ttl of the cache expires them. Each get may also start that refresh
+    a bit before refresh_after, with a probability rising as it nears
+    and as loads get slower, scaled by beta (XFetch), so popular items
+    are reloaded before anyone has to wait for them.
+    '''
+
+    def __init__(self, loader, policy=LRUCache, shards=8,
+                 refresh_after=None, beta=1.0, clock=time.monotonic,
+                 **kwargs):
+        '''
+        Initialize LoadingCache, keeping the items in a ShardedCache of
+        the given policy; other keyword arguments are passed to it, and
+        its sizer weighs the loaded items.
+        '''
+        if refresh_after is not None and refresh_after <= 0:
+            raise ValueError("refresh_after must be positive")
+        self.loader = loader
+        self.refresh_after = refresh_after
+        self.beta = beta
+        self.clock = clock
+        if kwargs.get('max_bytes') is not None:
+            kwargs['sizer'] = value_sizer(kwargs.get('sizer') or
+                                          default_sizer)
+        self.cache = ShardedCache(policy, shards, clock=clock, **kwargs)
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        '''Get an item by key, loading it on a miss'''
+        if key is None:
+            return None
+        entry = self.cache.get(key)
+        if entry is not None:
+            if self._should_refresh(entry):
+                self._refresh(key)
+            return entry.value
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                # The previous load may have finished since the miss
+                entry = self.cache.get(key)
+                if entry is not None:
+                    return entry.value
+                call = self.calls[key] = Call()
+        if not leader:
+            return call.result()
+        return self._load(key, call)
+
+    def _should_refresh(self, entry):
+        '''Tell if an entry is stale or randomly picked to refresh'''
+        if entry.refresh_at is None:
+            return False
+        # -log(u) is 0 most of the time but grows with a long tail
+        early = -entry.delta * self.beta * math.log(1.0 - random.random())
+        return self.clock() + early >= entry.refresh_at
+
+    def _refresh(self, key):
+        '''Reload a key in a background thread unless already loading'''
+        with self.lock:
+            if key in self.calls:
+                return
+            call = self.calls[key] = Call()
+        threading.Thread(target=self._load, args=(key, call, False),
+                         daemon=True).start()
+
+    def _load(self, key, call, reraise=True):
+        '''Call the loader for every thread waiting on call'''
+        try:
+            start = self.clock()
+            call.value = self.loader(key)
+            if call.value is not None:
+                entry = self._entry(call.value, self.clock() - start)
+                with self.lock:
+                    if self.calls.get(key) is call:
+                        # Neither put nor delete ran during the load
+                        self.cache.put(key, entry)
+            return call.value
+        except BaseException as error:
+            call.error = error
+            if reraise:
+                raise
+            # A failed refresh keeps serving the stale item
+            return None
+        finally:
+            with self.lock:
+                if self.calls.get(key) is call:
+                    del self.calls[key]
+            call.done.set()
+
+    def _entry(self, item, delta):
+        '''Entry of an item loaded in delta seconds'''
+        refresh_at = None
+        if self.refresh_after is not None:
+            refresh_at = self.clock() + self.refresh_after
+        return Entry(item, refresh_at, delta)
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in the cache'''
+        if item is not None:
+            entry = self._entry(item, 0)
+            with self.lock:
+                # The load in flight, if any, must not overwrite it
+                self.calls.pop(key, None)
+                self.cache.put(key, entry, ttl)
+
+    def delete(self, key):
+        '''Remove an item by key and return it'''
+        with self.lock:
+            # The load in flight, if any, must not put it back
+            self.calls.pop(key, None)
+            entry = self.cache.delete(key)
+        return None if entry is None else entry.value
+
+    def stats(self):
+        '''Counters and size of the cache'''
+        return self.cache.stats()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+'''Memoization decorator module'''
+
+
+import functools
+import threading
+from collections import namedtuple
+
+BasicCache = __import__('0-basic_cache').BasicCache
+LRUCache = __import__('3-lru_cache').LRUCache
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize',
+                                     'currsize'])
+
+# Stands for a None result, which a cache cannot hold
+NONE = object()
+# Separates the positional from the keyword arguments in a key
+KWARGS_MARK = object()
+FAST_TYPES = {int, str}
+
+
+def make_key(args, kwargs):
+    '''Hashable key of the arguments of a call'''
+    if kwargs:
+        return args + (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    if len(args) == 1 and type(args[0]) in FAST_TYPES:
+        return args[0]
+    return args
+
+
+def cached(policy=LRUCache, capacity=128, ttl=None, **options):
+    '''
+    Decorator memoizing a function in a cache of the given BaseCaching
+    policy holding capacity results for ttl seconds, forever if None.
+    Like maxsize of lru_cache, a capacity of None caches every result.
+    Other keyword arguments are passed to the cache.
+
+    The decorated function has cache_info() and cache_clear(), like the
+    ones of functools.lru_cache, and its cache as a cache attribute.
+    Like lru_cache it is thread safe: the cache is used under a lock,
+    which is released while the function runs.
+    '''
+    if capacity is None:
+        # Nothing is ever evicted, whatever the policy
+        policy = BasicCache
+
+    def decorator(function):
+        '''Wrap a function in its own cache'''
+        def new_cache():
+            '''Empty cache for the function'''
+            return policy(max_items=capacity, ttl=ttl, listener=None,
+                          **options)
+
+        lock = threading.Lock()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            '''Return the cached result, or call the function'''
+            key = make_key(args, kwargs)
+            with lock:
+                result = wrapper.cache.get(key)
+            if result is None:
+                result = function(*args, **kwargs)
+                with lock:
+                    wrapper.cache.put(key,
+                                      NONE if result is None else result)
+                return result
+            return None if result is NONE else result
+
+        def cache_info():
+            '''Hits, misses, capacity and size of the cache'''
+            with lock:
+                stats = wrapper.cache.stats()
+            return CacheInfo(stats['hits'], stats['misses'], capacity,
+                             stats['size'])
+
+        def cache_clear():
+            '''Empty the cache and reset its counters'''
+            with lock:
+                wrapper.cache = new_cache()
+
+        wrapper.cache = new_cache()
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+'''
+Miss ratio curves of a recorded access trace
+
+Reads a trace, one key per line, in a single pass. The LRU miss ratio
+of every capacity is exact, computed from the stack distance of each
+access. Other policies are simulated on a spatially hashed sample of
+the keys with proportionally scaled capacities, which approximates
+their miss ratio at a fraction of the cost.
+'''
+
+
+import argparse
+import sys
+import zlib
+
+from benchmark import find_policies
+
+SAMPLING_MODULUS = 1 << 24
+
+
+class StackDistance:
+    '''
+    LRU stack distances of a stream of keys, in O(log n) per access.
+
+    Every key is marked at the position of its last access in a Fenwick
+    tree, so the number of distinct keys accessed since is the number
+    of marks after that position. Positions are renumbered once the
+    tree is full, keeping its size proportional to the distinct keys.
+    '''
+
+    def __init__(self, size=1024):
+        '''Initialize StackDistance'''
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.last = {}
+        self.now = 0
+        self.marked = 0
+
+    def _add(self, position, delta):
+        '''Add delta to the mark of a position'''
+        position += 1
+        while position <= self.size:
+            self.tree[position] += delta
+            position += position & -position
+
+    def _prefix(self, position):
+        '''Number of marks up to a position included'''
+        position += 1
+        total = 0
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+        return total
+
+    def _renumber(self):
+        '''Move the marks to the first positions of a fitting tree'''
+        keys = sorted(self.last, key=self.last.get)
+        self.size = max(self.size, 2 * len(keys))
+        self.tree = [0] * (self.size + 1)
+        self.last = {}
+        for position, key in enumerate(keys):
+            self.last[key] = position
+            self._add(position, 1)
+        self.now = len(keys)
+
+    def access(self, key):
+        '''Stack distance of an access, None for a first access'''
+        if self.now == self.size:
+            self._renumber()
+        previous = self.last.get(key)
+        distance = None
+        if previous is None:
+            self.marked += 1
+        else:
+            distance = self.marked - self._prefix(previous) + 1
+            self._add(previous, -1)
+        self._add(self.now, 1)
+        self.last[key] = self.now
+        self.now += 1
+        return distance
+
+
+def lru_miss_ratios(distances, total, capacities):
+    '''Exact LRU miss ratio of every capacity from a distance histogram'''
+    ratios = {}
+    hits = 0
+    ordered = sorted(distances.items())
+    index = 0
+    for capacity in sorted(capacities):
+        while index < len(ordered) and ordered[index][0] <= capacity:
+            hits += ordered[index][1]
+            index += 1
+        ratios[capacity] = (total - hits) / total if total else 0.0
+    return ratios
+
+
+def is_sampled(key, threshold):
+    '''Tell if a key is part of the spatial sample'''
+    return zlib.crc32(key.encode()) % SAMPLING_MODULUS < threshold
+
+
+def simulate(lines, capacities, policies, rate):
+    '''Replay a trace once, return the miss ratios by policy name'''
+    tracker = StackDistance()
+    distances = {}
+    total = 0
+    threshold = int(rate * SAMPLING_MODULUS)
+    caches = {}
+    for name, policy in policies:
+        for capacity in capacities:
+            scaled = max(1, round(capacity * rate))
+            caches[(name, capacity)] = policy(max_items=scaled,
+                                              listener=None)
+    sampled = {key: 0 for key in caches}
+    misses = {key: 0 for key in caches}
+    for line in lines:
+        key = line.strip()
+        if not key:
+            continue
+        total += 1
+        distance = tracker.access(key)
+        if distance is not None:
+            distances[distance] = distances.get(distance, 0) + 1
+        if caches and is_sampled(key, threshold):
+            for run, cache in caches.items():
+                sampled[run] += 1
+                if cache.get(key) is None:
+                    misses[run] += 1
+                    cache.put(key, True)
+    curves = {'LRU': lru_miss_ratios(distances, total, capacities)}
+    for (name, capacity), count in sampled.items():
+        curves.setdefault(name, {})[capacity] = (
+            misses[(name, capacity)] / count if count else 0.0)
+    return curves
+
+
+def main():
+    '''Parse the arguments and print the miss ratio curves'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('trace', help='file of keys, - for stdin')
+    parser.add_argument('--capacities', nargs='*', type=int,
+                        default=[2 ** exponent for exponent in range(17)])
+    parser.add_argument('--policies', nargs='*', default=[],
+                        help='class names to simulate on the sample')
+    parser.add_argument('--rate', type=float, default=0.01,
+                        help='fraction of the keys sampled')
+    args = parser.parse_args()
+    if not 0 < args.rate <= 1:
+        parser.error('rate must be in ]0, 1]')
+
+    policies = [(name, policy) for name, policy in find_policies()
+                if name in args.policies]
+    if args.trace == '-':
+        curves = simulate(sys.stdin, args.capacities, policies, args.rate)
+    else:
+        with open(args.trace) as lines:
+            curves = simulate(lines, args.capacities, policies, args.rate)
+    names = list(curves)
+    print(''.join(['{:>10}'.format('capacity')] +
+                  ['{:>14}'.format(name) for name in names]))
+    for capacity in sorted(args.capacities):
+        print(''.join(['{:>10}'.format(capacity)] +
+                      ['{:>14.4f}'.format(curves[name][capacity])
+                       for name in names]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+'''ShardedCache module'''
+
+
+import threading
+
+from cache_stats import CacheStats
+
+
+def split(budget, shards, index):
+    '''Share of a budget of a shard, the first ones get the remainder'''
+    share, remainder = divmod(budget, shards)
+    return share + (index < remainder)
+
+
+class ShardedCache:
+    '''
+    ShardedCache is a thread safe caching system splitting the keys of
+    any BaseCaching policy over independent shards by hash. Each shard
+    has its own lock, so threads working on different shards never wait
+    for each other.
+    '''
+
+    def __init__(self, policy, shards=8, max_items=None, max_bytes=None,
+                 **kwargs):
+        '''
+        Initialize ShardedCache with shards instances of policy, fewer
+        if max_items or max_bytes is lower. max_items and max_bytes are
+        the capacity of the whole cache, shared as evenly as possible
+        between the shards; other keyword arguments are passed to every
+        shard.
+        '''
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        for budget in (max_items, max_bytes):
+            if budget is not None and budget >= 1:
+                shards = min(shards, budget)
+        self.shards = []
+        for index in range(shards):
+            if max_items is not None:
+                kwargs['max_items'] = split(max_items, shards, index)
+            if max_bytes is not None:
+                kwargs['max_bytes'] = split(max_bytes, shards, index)
+            self.shards.append(policy(**kwargs))
+        self.locks = [threading.Lock() for _ in range(shards)]
+
+    def _index(self, key):
+        '''Index of the shard owning a key'''
+        return hash(key) % len(self.shards)
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in the cache, for ttl seconds if given'''
+        if key is None or item is None:
+            return
+        index = self._index(key)
+        with self.locks[index]:
+            self.shards[index].put(key, item, ttl)
+
+    def get(self, key):
+        '''Get an item by key'''
+        if key is None:
+            return None
+        index = self._index(key)
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def delete(self, key):
+        '''Remove an item by key and return it'''
+        if key is None:
+            return None
+        index = self._index(key)
+        with self.locks[index]:
+            return self.shards[index].delete(key)
+
+    def _group(self, keys):
+        '''Keys grouped by the index of their shard'''
+        groups = {}
+        for key in keys:
+            if key is not None:
+                groups.setdefault(self._index(key), []).append(key)
+        return groups
+
+    def get_many(self, keys):
+        '''Dict of the items cached for keys, locking each shard once'''
+        found = {}
+        for index, group in self._group(keys).items():
+            with self.locks[index]:
+                found.update(self.shards[index].get_many(group))
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        '''Add every item of a dict in the cache, locking each shard once'''
+        for index, group in self._group(mapping).items():
+            items = {key: mapping[key] for key in group}
+            with self.locks[index]:
+                self.shards[index].put_many(items, ttl)
+
+    def delete_many(self, keys):
+        '''Remove items by key, locking each shard once, return how many'''
+        removed = 0
+        for index, group in self._group(keys).items():
+            with self.locks[index]:
+                removed += self.shards[index].delete_many(group)
+        return removed
+
+    def reap(self):
+        '''Remove the expired items of every shard'''
+        removed = 0
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                removed += shard.reap()
+        return removed
+
+    def stats(self):
+        '''Counters and size of every shard added up'''
+        counters = CacheStats()
+        size = total_bytes = 0
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                counters.merge(shard.counters)
+                size += len(shard.cache_data)
+                total_bytes += shard.total_bytes
+        stats = counters.snapshot()
+        stats['size'] = size
+        stats['bytes'] = total_bytes
+        return stats
+
+    def reset_stats(self):
+        '''Set the counters of every shard back to zero'''
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.reset_stats()
+
+    def dump_entries(self):
+        '''Entries of every shard, one shard after the other'''
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                entries = list(shard.dump_entries())
+            for entry in entries:
+                yield entry
+
+    def restore_entry(self, key, item, meta=None, ttl=None):
+        '''Put back an entry yielded by dump_entries'''
+        if key is None or item is None:
+            return
+        index = self._index(key)
+        with self.locks[index]:
+            self.shards[index].restore_entry(key, item, meta, ttl)
+
+    @property
+    def cache_data(self):
+        '''Snapshot of the items of every shard'''
+        cache_data = {}
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.reap()
+                cache_data.update(shard.cache_data)
+        return cache_data
+
+    def __len__(self):
+        '''Number of items in the cache'''
+        return sum(len(shard.cache_data) for shard in self.shards)
+
+    def print_cache(self):
+        '''Print the items of every shard'''
+        cache_data = self.cache_data
+        print("Current cache:")
+        for key in sorted(cache_data.keys()):
+            print("{}: {}".format(key, cache_data.get(key)))
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+'''SharedMemoryCache module'''
+
+
+import fcntl
+import hashlib
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from base_caching import BaseCaching, CAPACITY, EXPIRED, EXPLICIT
+
+MAGIC = b'ALUCACHE'
+VERSION = 1
+# magic, version, capacity, slots, slot size, count, tombstones, hand
+HEADER = struct.Struct('<8sIIIIIII')
+# Sequence number of the seqlock, odd while a writer is at work
+SEQ = struct.Struct('<Q')
+SEQ_OFFSET = HEADER.size + 4
+TABLE_OFFSET = SEQ_OFFSET + SEQ.size
+# state, reference bit, key length, item length, hash, expiry
+SLOT = struct.Struct('<BBHIQd')
+EMPTY, USED, TOMBSTONE = 0, 1, 2
+NEVER = float('inf')
+
+
+def key_hash(data):
+    '''Hash of a pickled key, the same in every process'''
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          'little')
+
+
+def open_segment(name, create, size):
+    '''
+    Shared memory segment which outlives this process, instead of being
+    unlinked by the resource tracker when it exits
+    '''
+    try:
+        return shared_memory.SharedMemory(name, create, size, track=False)
+    except TypeError:
+        # Before Python 3.13
+        memory = shared_memory.SharedMemory(name, create, size)
+        resource_tracker.unregister(memory._name, 'shared_memory')
+        return memory
+
+
+def unlink_segment(memory):
+    '''Destroy a segment opened by open_segment'''
+    if sys.version_info < (3, 13):
+        # unlink() unregisters the segment, which open_segment did already
+        resource_tracker.register(memory._name, 'shared_memory')
+    memory.unlink()
+
+
+def attach(name, size):
+    '''Create or open the shared memory segment called name'''
+    try:
+        return open_segment(name, True, size), True
+    except FileExistsError:
+        return open_segment(name, False, 0), False
+
+
+class SharedMemoryCache(BaseCaching):
+    '''
+    SharedMemoryCache inherits from BaseCaching and keeps its entries
+    in a multiprocessing shared memory segment, so every process of the
+    host opening the same name shares one cache.
+
+    Entries are pickled in a fixed-slot open addressing table of twice
+    MAX_ITEMS slots of slot_size bytes, and evicted with CLOCK. Writers
+    take a lock on a file next to the segment; readers never lock, they
+    retry when the sequence number of the seqlock moved under them.
+    The segment stays until unlink() is called, and the capacity and
+    slot size are those of the process which created it.
+    '''
+
+    def __init__(self, name='alu_web_cache', slot_size=512, **kwargs):
+        '''Initialize SharedMemoryCache'''
+        for option in ('max_bytes', 'sizer'):
+            if kwargs.get(option) is not None:
+                raise ValueError("{} is not supported, entries are bounded "
+                                 "by slot_size".format(option))
+        super().__init__(**kwargs)
+        if slot_size <= SLOT.size:
+            raise ValueError("slot_size must be over {}".format(SLOT.size))
+        slots = 1
+        while slots < 2 * self.MAX_ITEMS:
+            slots *= 2
+        self.thread_lock = threading.Lock()
+        lock_path = os.path.join(tempfile.gettempdir(),
+                                 '{}.lock'.format(name))
+        self.lock_file = open(lock_path, 'a+b')
+        # Nobody reads the header before its creator wrote it
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            self.memory, created = attach(
+                name, TABLE_OFFSET + slots * slot_size)
+            self.buffer = self.memory.buf
+            if created:
+                HEADER.pack_into(self.buffer, 0, MAGIC, VERSION,
+                                 self.MAX_ITEMS, slots, slot_size, 0, 0, 0)
+            header = HEADER.unpack_from(self.buffer, 0)
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+        if header[:2] != (MAGIC, VERSION):
+            raise ValueError("{} is not a cache segment".format(name))
+        self.MAX_ITEMS, self.slots, self.slot_size = header[2:5]
+        self.name = name
+
+    def _write_lock(self):
+        '''Context manager excluding the other writers'''
+        return WriteLock(self)
+
+    def _header(self, field):
+        '''Value of a header field by index'''
+        return HEADER.unpack_from(self.buffer, 0)[field]
+
+    def _set_header(self, field, value):
+        '''Change a header field by index'''
+        offset = 8 + 4 * (field - 1)
+        struct.pack_into('<I', self.buffer, offset, value)
+
+    def _seq(self):
+        '''Current sequence number of the seqlock'''
+        return SEQ.unpack_from(self.buffer, SEQ_OFFSET)[0]
+
+    def _offset(self, index):
+        '''Offset of a slot'''
+        return TABLE_OFFSET + index * self.slot_size
+
+    def _find(self, data, digest):
+        '''Index of the slot of a key or None, and the first free slot'''
+        mask = self.slots - 1
+        index = digest & mask
+        free = None
+        for _ in range(self.slots):
+            offset = self._offset(index)
+            state, _, key_length, _, slot_hash, _ = SLOT.unpack_from(
+                self.buffer, offset)
+            if state == EMPTY:
+                return None, index if free is None else free
+            if state == TOMBSTONE:
+                if free is None:
+                    free = index
+            elif slot_hash == digest and key_length == len(data):
+                start = offset + SLOT.size
+                if self.buffer[start:start + key_length] == data:
+                    return index, free
+            index = (index + 1) & mask
+        return None, free
+
+    def _read(self, index):
+        '''Pickled key and item, and expiry, of a slot'''
+        offset = self._offset(index)
+        _, _, key_length, item_length, _, expiry = SLOT.unpack_from(
+            self.buffer, offset)
+        start = offset + SLOT.size
+        return (bytes(self.buffer[start:start + key_length]),
+                bytes(self.buffer[start + key_length:
+                                  start + key_length + item_length]),
+                expiry)
+
+    def _write(self, index, data, item_data, digest, expiry):
+        '''Store a pickled entry in a slot'''
+        offset = self._offset(index)
+        SLOT.pack_into(self.buffer, offset, USED, 0, len(data),
+                       len(item_data), digest, expiry)
+        start = offset + SLOT.size
+        self.buffer[start:start + len(data)] = data
+        start += len(data)
+        self.buffer[start:start + len(item_data)] = item_data
+
+    def _remove(self, index):
+        '''Turn a used slot into a tombstone'''
+        self.buffer[self._offset(index)] = TOMBSTONE
+        self._set_header(5, self._header(5) - 1)
+        self._set_header(6, self._header(6) + 1)
+
+    def _evict(self):
+        '''Remove the first unreferenced entry under the CLOCK hand'''
+        hand = self._header(7)
+        while True:
+            offset = self._offset(hand)
+            index = hand
+            hand = (hand + 1) % self.slots
+            if self.buffer[offset] != USED:
+                continue
+            if self.buffer[offset + 1]:
+                self.buffer[offset + 1] = 0
+                continue
+            self._set_header(7, hand)
+            entry = self._read(index)
+            self._remove(index)
+            return entry
+
+    def _compact(self):
+        '''Rehash the used slots to get rid of the tombstones'''
+        entries = []
+        for index in range(self.slots):
+            offset = self._offset(index)
+            if self.buffer[offset] == USED:
+                digest = SLOT.unpack_from(self.buffer, offset)[4]
+                entries.append((digest, self._read(index)))
+        self.buffer[TABLE_OFFSET:] = bytes(len(self.buffer) - TABLE_OFFSET)
+        for digest, (data, item_data, expiry) in entries:
+            index = self._find(data, digest)[1]
+            self._write(index, data, item_data, digest, expiry)
+        self._set_header(6, 0)
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in the cache, for ttl seconds if given'''
+        if key is None or item is None:
+            return
+        if ttl is None:
+            ttl = self.ttl
+        data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        item_data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if SLOT.size + len(data) + len(item_data) > self.slot_size:
+            # Could never fit in a slot, and the old item is stale
+            self._delete(data, key_hash(data), CAPACITY)
+            return
+        expiry = NEVER if ttl is None else self.clock() + ttl
+        evicted = []
+        with self._write_lock():
+            self._store(data, item_data, key_hash(data), expiry, evicted)
+        for entry in evicted:
+            self._report(entry, CAPACITY)
+
+    def put_many(self, mapping, ttl=None):
+        '''Add every item of a dict in the cache, taking the lock once'''
+        if ttl is None:
+            ttl = self.ttl
+        entries = []
+        for key, item in mapping.items():
+            if key is None or item is None:
+                continue
+            data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+            item_data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+            if SLOT.size + len(data) + len(item_data) > self.slot_size:
+                # Could never fit in a slot, as in put
+                item_data = None
+            entries.append((data, item_data, key_hash(data)))
+        expiry = NEVER if ttl is None else self.clock() + ttl
+        evicted = []
+        with self._write_lock():
+            for data, item_data, digest in entries:
+                if item_data is not None:
+                    self._store(data, item_data, digest, expiry, evicted)
+                    continue
+                index = self._find(data, digest)[0]
+                if index is not None:
+                    evicted.append(self._read(index))
+                    self._remove(index)
+        for entry in evicted:
+            self._report(entry, CAPACITY)
+
+    def _store(self, data, item_data, digest, expiry, evicted):
+        '''
+        Write a pickled entry under the write lock, appending the entry
+        it evicted to evicted
+        '''
+        index, free = self._find(data, digest)
+        if index is not None:
+            self.counters.updates += 1
+            self._write(index, data, item_data, digest, expiry)
+            self.buffer[self._offset(index) + 1] = 1
+            return
+        self.counters.puts += 1
+        if self._header(5) >= self.MAX_ITEMS:
+            evicted.append(self._evict())
+            free = self._find(data, digest)[1]
+        self._write(free, data, item_data, digest, expiry)
+        self._set_header(5, self._header(5) + 1)
+        if self._header(6) > self.slots // 4:
+            self._compact()
+
+    def get(self, key):
+        '''Get an item by key'''
+        if key is None:
+            self.counters.misses += 1
+            return None
+        data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        digest = key_hash(data)
+        while True:
+            seq = self._seq()
+            if seq % 2:
+                time.sleep(0)
+                continue
+            index = self._find(data, digest)[0]
+            entry = None if index is None else self._read(index)
+            if self._seq() == seq:
+                break
+        if entry is None:
+            self.counters.misses += 1
+            return None
+        now = self.clock()
+        if entry[2] <= now:
+            self._delete(data, digest, EXPIRED, now)
+            self.counters.misses += 1
+            return None
+        # A lost reference bit only costs a second chance
+        self.buffer[self._offset(index) + 1] = 1
+        self.counters.hits += 1
+        return pickle.loads(entry[1])
+
+    def delete(self, key):
+        '''Remove an item by key and return it'''
+        if key is None:
+            return None
+        data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        entry = self._delete(data, key_hash(data), EXPLICIT)
+        return None if entry is None else pickle.loads(entry[1])
+
+    def get_many(self, keys):
+        '''Dict of the items cached for keys'''
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    def delete_many(self, keys):
+        '''Remove items by key, taking the lock once, return how many'''
+        pickled = [pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+                   for key in keys if key is not None]
+        removed = []
+        with self._write_lock():
+            for data in pickled:
+                index = self._find(data, key_hash(data))[0]
+                if index is not None:
+                    removed.append(self._read(index))
+                    self._remove(index)
+        for entry in removed:
+            self._report(entry, EXPLICIT)
+        return len(removed)
+
+    def _delete(self, data, digest, reason, expired_at=None):
+        '''
+        Remove a pickled key, if it expired at expired_at when given,
+        and report it to the listener
+        '''
+        with self._write_lock():
+            index = self._find(data, digest)[0]
+            entry = None if index is None else self._read(index)
+            if entry is not None and expired_at is not None:
+                if entry[2] > expired_at:
+                    # Put again by another process in the meantime
+                    entry = None
+            if entry is not None:
+                self._remove(index)
+        if entry is not None:
+            self._report(entry, reason)
+        return entry
+
+    def _report(self, entry, reason):
+        '''Count an eviction and notify the listener'''
+        evictions = self.counters.evictions
+        evictions[reason] = evictions.get(reason, 0) + 1
+        if self.listener is not None:
+            self.listener(pickle.loads(entry[0]), pickle.loads(entry[1]),
+                          reason)
+
+    def _entries(self):
+        '''Consistent list of the pickled entries of every used slot'''
+        while True:
+            seq = self._seq()
+            if seq % 2:
+                time.sleep(0)
+                continue
+            entries = [self._read(index) for index in range(self.slots)
+                       if self.buffer[self._offset(index)] == USED]
+            if self._seq() == seq:
+                return entries
+
+    def reap(self):
+        '''Remove the expired items and return how many were removed'''
+        now = self.clock()
+        expired = [entry for entry in self._entries() if entry[2] <= now]
+        for data, _, _ in expired:
+            self._delete(data, key_hash(data), EXPIRED, now)
+        return len(expired)
+
+    @property
+    def cache_data(self):
+        '''Snapshot of the items in shared memory'''
+        now = self.clock()
+        return {pickle.loads(data): pickle.loads(item_data)
+                for data, item_data, expiry in self._entries()
+                if expiry > now}
+
+    @cache_data.setter
+    def cache_data(self, value):
+        '''The items live in shared memory, not in a dictionary'''
+
+    def dump_entries(self):
+        '''Yield (key, item, meta, ttl) for every live entry'''
+        now = self.clock()
+        for data, item_data, expiry in self._entries():
+            if expiry > now:
+                ttl = None if expiry == NEVER else expiry - now
+                yield pickle.loads(data), pickle.loads(item_data), None, ttl
+
+    def close(self):
+        '''Detach this process from the segment'''
+        self.buffer = None
+        self.memory.close()
+        self.lock_file.close()
+
+    def unlink(self):
+        '''Destroy the segment, for every process'''
+        unlink_segment(self.memory)
+
+
+class WriteLock:
+    '''Thread and process lock of the writers of a SharedMemoryCache,
+    bumping the sequence number of the seqlock around their work'''
+
+    def __init__(self, cache):
+        '''Initialize WriteLock'''
+        self.cache = cache
+
+    def __enter__(self):
+        '''Take the locks and make the sequence number odd'''
+        self.cache.thread_lock.acquire()
+        fcntl.flock(self.cache.lock_file, fcntl.LOCK_EX)
+        self._bump(1)
+
+    def __exit__(self, *exc_info):
+        '''Make the sequence number even and release the locks'''
+        self._bump(0)
+        fcntl.flock(self.cache.lock_file, fcntl.LOCK_UN)
+        self.cache.thread_lock.release()
+
+    def _bump(self, parity):
+        '''
+        Move the sequence number to the next one of the given parity,
+        which a writer killed while holding the lock cannot invert
+        '''
+        buffer = self.cache.buffer
+        seq = SEQ.unpack_from(buffer, SEQ_OFFSET)[0] + 1
+        if seq % 2 != parity:
+            seq += 1
+        SEQ.pack_into(buffer, SEQ_OFFSET, seq)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+'''
+Cache snapshots module
+
+A snapshot is a binary file holding the entries of a cache with the
+state of its policy: order, frequencies and the time left to live of
+every entry. It is written and read back one entry at a time, so
+neither saving nor loading holds a second copy of the cache in memory.
+Snapshots are pickled: only load the ones this application wrote.
+'''
+
+
+import os
+import pickle
+import struct
+import time
+
+MAGIC = b'CACHESNAP'
+VERSION = 1
+LENGTH = struct.Struct('>I')
+
+
+def write_record(stream, record):
+    '''Write a length prefixed pickled record'''
+    data = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+    stream.write(LENGTH.pack(len(data)))
+    stream.write(data)
+
+
+def read_record(stream):
+    '''Read a record written by write_record, None at the end'''
+    prefix = stream.read(LENGTH.size)
+    if not prefix:
+        return None
+    if len(prefix) < LENGTH.size:
+        raise ValueError("truncated snapshot")
+    size = LENGTH.unpack(prefix)[0]
+    data = stream.read(size)
+    if len(data) < size:
+        raise ValueError("truncated snapshot")
+    return pickle.loads(data)
+
+
+def save_snapshot(cache, path):
+    '''
+    Write the entries of a cache to path, replacing it atomically, and
+    return how many were written
+    '''
+    count = 0
+    temporary = '{}.tmp'.format(path)
+    with open(temporary, 'wb') as stream:
+        stream.write(MAGIC + bytes([VERSION]))
+        write_record(stream, {'policy': type(cache).__name__,
+                              'time': time.time()})
+        for entry in cache.dump_entries():
+            write_record(stream, entry)
+            count += 1
+    os.replace(temporary, path)
+    return count
+
+
+def load_snapshot(cache, path):
+    '''
+    Put the entries of the snapshot at path back in a cache and return
+    how many were restored. Entries which expired since the snapshot
+    was saved are skipped, and the policy state is only restored in a
+    cache of the same policy.
+    '''
+    count = 0
+    with open(path, 'rb') as stream:
+        if stream.read(len(MAGIC) + 1) != MAGIC + bytes([VERSION]):
+            raise ValueError("{} is not a cache snapshot".format(path))
+        header = read_record(stream)
+        same_policy = header['policy'] == type(cache).__name__
+        elapsed = max(time.time() - header['time'], 0)
+        while True:
+            record = read_record(stream)
+            if record is None:
+                return count
+            key, item, meta, ttl = record
+            if ttl is not None:
+                ttl -= elapsed
+                if ttl <= 0:
+                    continue
+            cache.restore_entry(key, item, meta if same_policy else None,
+                                ttl)
+            count += 1
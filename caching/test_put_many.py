@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+'''put_many tests of every policy'''
+
+
+import random
+import unittest
+
+from benchmark import find_policies
+
+
+def warm_up(policy, seed):
+    '''Cache of a policy after a random workload'''
+    rng = random.Random(seed)
+    cache = policy(max_items=8, listener=None)
+    for _ in range(200):
+        key = rng.randrange(16)
+        action = rng.random()
+        if action < 0.5:
+            cache.put(key, rng.random())
+        elif action < 0.9:
+            cache.get(key)
+        else:
+            cache.delete(key)
+    return cache
+
+
+class TestPutMany(unittest.TestCase):
+    '''put_many writes a batch as sequential puts would'''
+
+    def assertSameCache(self, cache, expected):
+        '''Same entries, in the same order, and the same counters'''
+        self.assertEqual([entry[:3] for entry in cache.dump_entries()],
+                         [entry[:3] for entry in expected.dump_entries()])
+        self.assertEqual(cache.stats(), expected.stats())
+
+    def test_update_of_the_next_victim(self):
+        '''A key updated by the batch is not evicted by it'''
+        for name, policy in find_policies():
+            with self.subTest(policy=name):
+                cache = policy(max_items=2, listener=None)
+                expected = policy(max_items=2, listener=None)
+                for each in (cache, expected):
+                    each.put('A', 1)
+                    each.put('B', 2)
+                cache.put_many({'C': 3, 'A': 10})
+                expected.put('C', 3)
+                expected.put('A', 10)
+                self.assertEqual(cache.cache_data.get('A'), 10)
+                self.assertSameCache(cache, expected)
+
+    def test_same_as_sequential_puts(self):
+        '''A new key then updates end as they would one by one'''
+        for name, policy in find_policies():
+            for seed in range(20):
+                with self.subTest(policy=name, seed=seed):
+                    cache = warm_up(policy, seed)
+                    expected = warm_up(policy, seed)
+                    rng = random.Random(seed)
+                    cached = list(cache.cache_data)
+                    mapping = {}
+                    if rng.random() < 0.8:
+                        mapping[100 + seed] = 'new'
+                    for key in rng.sample(cached, min(len(cached), 3)):
+                        mapping[key] = 'updated'
+                    evicted = []
+                    expected.listener = lambda key, *_: evicted.append(key)
+                    for key, item in mapping.items():
+                        expected.put(key, item)
+                    if set(evicted) & set(mapping):
+                        # Sequential puts evicted a key of the batch
+                        continue
+                    cache.put_many(mapping)
+                    self.assertSameCache(cache, expected)
+
+    def test_batch_keeps_its_keys(self):
+        '''Every key of a batch that fits is cached after it'''
+        for name, policy in find_policies():
+            for seed in range(20):
+                with self.subTest(policy=name, seed=seed):
+                    cache = warm_up(policy, seed)
+                    rng = random.Random(seed)
+                    keys = rng.sample(range(24), rng.randrange(1, 9))
+                    mapping = {key: rng.random() for key in keys}
+                    before = cache.stats()
+                    cache.put_many(mapping)
+                    for key, item in mapping.items():
+                        self.assertEqual(cache.cache_data.get(key), item)
+                    after = cache.stats()
+                    self.assertEqual(
+                        after['puts'] + after['updates'],
+                        before['puts'] + before['updates'] + len(keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
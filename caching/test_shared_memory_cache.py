@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+'''SharedMemoryCache tests'''
+
+
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+
+from shared_memory_cache import SharedMemoryCache
+
+
+def die_writing(name, ready):
+    '''Take the write lock of a cache and wait to be killed'''
+    cache = SharedMemoryCache(name, listener=None)
+    cache._write_lock().__enter__()
+    ready.set()
+    time.sleep(60)
+
+
+class TestSharedMemoryCache(unittest.TestCase):
+    '''SharedMemoryCache shared by several processes'''
+
+    def setUp(self):
+        '''Cache in a segment of its own'''
+        self.name = 'test_cache_{}'.format(os.getpid())
+        self.cache = SharedMemoryCache(self.name, listener=None)
+
+    def tearDown(self):
+        '''Destroy the segment and its lock file'''
+        self.cache.unlink()
+        self.cache.close()
+        os.remove(os.path.join(tempfile.gettempdir(),
+                               '{}.lock'.format(self.name)))
+
+    def get_within(self, key, seconds):
+        '''Get an item, failing if it takes more than seconds'''
+        found = []
+        reader = threading.Thread(target=lambda: found.append(
+            self.cache.get(key)), daemon=True)
+        reader.start()
+        reader.join(seconds)
+        self.assertFalse(reader.is_alive(), "get never returned")
+        return found[0]
+
+    def test_writer_killed_while_writing(self):
+        '''Readers recover once a writer dies holding the lock'''
+        self.cache.put('a', 1)
+        context = multiprocessing.get_context('fork')
+        ready = context.Event()
+        writer = context.Process(target=die_writing,
+                                 args=(self.name, ready))
+        writer.start()
+        self.assertTrue(ready.wait(10))
+        os.kill(writer.pid, signal.SIGKILL)
+        writer.join()
+        self.cache.put('z', 26)
+        self.assertEqual(self.get_within('z', 2), 26)
+        self.assertEqual(self.get_within('a', 2), 1)
+        self.cache.put('z', 0)
+        self.assertEqual(self.get_within('z', 2), 0)
+
+    def test_item_too_large_for_a_slot(self):
+        '''A key updated with an item no slot can hold is dropped'''
+        evicted = []
+        self.cache.listener = lambda *entry: evicted.append(entry)
+        self.cache.put('k', 'small')
+        self.cache.put('k', 'x' * 1000)
+        self.assertIsNone(self.cache.get('k'))
+        self.cache.put_many({'a': 'small', 'b': 'small'})
+        self.cache.put_many({'a': 'x' * 1000, 'b': 'new'})
+        self.assertEqual(self.cache.cache_data, {'b': 'new'})
+        self.assertEqual(evicted, [('k', 'small', 'capacity'),
+                                   ('a', 'small', 'capacity')])
+
+
+if __name__ == '__main__':
+    unittest.main()
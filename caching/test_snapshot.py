@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+'''Snapshot round trip tests of every policy'''
+
+
+import os
+import random
+import tempfile
+import unittest
+
+from benchmark import find_policies
+from snapshot import load_snapshot, save_snapshot
+
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+
+class TestSnapshot(unittest.TestCase):
+    '''save_snapshot then load_snapshot rebuilds the same cache'''
+
+    def setUp(self):
+        '''Path of a temporary snapshot'''
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        '''Remove the temporary snapshot'''
+        os.remove(self.path)
+
+    def round_trip(self, cache, restored):
+        '''Save cache, load it in restored and compare their entries'''
+        save_snapshot(cache, self.path)
+        load_snapshot(restored, self.path)
+        self.assertEqual(
+            [entry[:3] for entry in restored.dump_entries()],
+            [entry[:3] for entry in cache.dump_entries()])
+
+    def test_every_policy(self):
+        '''Random workloads survive a round trip'''
+        for name, policy in find_policies():
+            for seed in range(5):
+                with self.subTest(policy=name, seed=seed):
+                    rng = random.Random(seed)
+                    cache = policy(max_items=8, listener=None)
+                    for _ in range(200):
+                        key = rng.randrange(16)
+                        action = rng.random()
+                        if action < 0.5:
+                            cache.put(key, rng.random())
+                        elif action < 0.9:
+                            cache.get(key)
+                        else:
+                            cache.delete(key)
+                    self.round_trip(cache,
+                                    policy(max_items=8, listener=None))
+
+    def test_lfu_without_frequency_one(self):
+        '''LFU keys all hit once come back with their frequency'''
+        cache = LFUCache(listener=None)
+        for key in 'abc':
+            cache.put(key, key.upper())
+            cache.get(key)
+        self.round_trip(cache, LFUCache(listener=None))
+
+    def test_lfu_into_non_empty_cache(self):
+        '''LFU buckets stay sorted when loading over existing keys'''
+        cache = LFUCache(listener=None)
+        cache.put('a', 'A')
+        for _ in range(3):
+            cache.get('a')
+        save_snapshot(cache, self.path)
+        restored = LFUCache(listener=None)
+        restored.put('b', 'B')
+        for _ in range(5):
+            restored.get('b')
+        restored.put('c', 'C')
+        restored.get('c')
+        load_snapshot(restored, self.path)
+        self.assertEqual(list(restored.freq_order), [2, 4, 6])
+        self.assertEqual(restored._ordered_keys(), ['c', 'a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
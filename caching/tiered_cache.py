@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+'''TieredCache module'''
+
+
+import pickle
+import sqlite3
+import threading
+import time
+
+from base_caching import CAPACITY
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    item BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)
+    WHERE expires_at IS NOT NULL;
+'''
+# Bound on the variables of a statement in old SQLite versions
+BATCH = 500
+
+
+def dumps(value):
+    '''Pickled bytes of a key or an item'''
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+class TieredCache:
+    '''
+    TieredCache is a thread safe two level caching system: any policy
+    keeps the hot entries in memory (L1), and the entries it evicts for
+    room are demoted to a SQLite file (L2) instead of being lost. An L1
+    miss looks the key up in L2 and promotes a hit back to L1.
+
+    An entry lives in a single level. L2 is bounded by l2_max_items
+    entries and optionally l2_max_bytes pickled bytes, and evicts the
+    least recently used ones, after the expired ones. Entries keep their
+    time to live in L2, where expired entries are never demoted. Keys
+    and items are pickled: only open files this application wrote.
+    '''
+
+    def __init__(self, path, policy=LRUCache, l2_max_items=100000,
+                 l2_max_bytes=None, ttl=None, **kwargs):
+        '''
+        Initialize TieredCache with L1 an instance of policy(**kwargs)
+        and L2 the SQLite database at path
+        '''
+        if l2_max_items < 1:
+            raise ValueError("l2_max_items must be at least 1")
+        if l2_max_bytes is not None and l2_max_bytes < 1:
+            raise ValueError("l2_max_bytes must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        kwargs['listener'] = self._demote
+        self.l1 = policy(**kwargs)
+        self.l2_max_items = l2_max_items
+        self.l2_max_bytes = l2_max_bytes
+        self.ttl = ttl
+        self.deadlines = {}
+        self.batch = {}
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.l2_count, self.l2_bytes = self.db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+        ).fetchone()
+        self.l2_counters = {'hits': 0, 'misses': 0, 'demotions': 0}
+
+    def put(self, key, item, ttl=None):
+        '''Add an item in L1, for ttl seconds if given'''
+        if key is None or item is None:
+            return
+        with self.lock:
+            if self.l2_count and key not in self.l1.cache_data:
+                # Only one level may hold a key
+                self._l2_delete([dumps(key)])
+            self._l1_put({key: item}, ttl)
+
+    def put_many(self, mapping, ttl=None):
+        '''Add every item of a dict in L1, for ttl seconds if given'''
+        items = {key: item for key, item in mapping.items()
+                 if key is not None and item is not None}
+        with self.lock:
+            if self.l2_count:
+                self._l2_delete([dumps(key) for key in items
+                                 if key not in self.l1.cache_data])
+            demotions = self.l2_counters['demotions']
+            self.batch = items
+            try:
+                self._l1_put(items, ttl)
+            finally:
+                self.batch = {}
+            if self.l2_counters['demotions'] != demotions:
+                # A key of the batch may have been demoted, then put back
+                self._l2_delete([dumps(key) for key in items
+                                 if key in self.l1.cache_data])
+
+    def get(self, key):
+        '''Get an item from L1, or from L2 promoting it'''
+        if key is None:
+            return None
+        with self.lock:
+            item = self.l1.get(key)
+            if item is not None:
+                return item
+            return self._promote([key]).get(key)
+
+    def get_many(self, keys):
+        '''Dict of the items cached for keys in either level'''
+        keys = [key for key in keys if key is not None]
+        with self.lock:
+            found = self.l1.get_many(keys)
+            missing = [key for key in keys if key not in found]
+            if missing:
+                found.update(self._promote(missing))
+            return found
+
+    def delete(self, key):
+        '''Remove an item from either level and return it'''
+        if key is None:
+            return None
+        with self.lock:
+            item = self.l1.delete(key)
+            if item is not None:
+                return item
+            entries = self._l2_delete([dumps(key)])
+            return pickle.loads(entries[0][1]) if entries else None
+
+    def delete_many(self, keys):
+        '''Remove items by key from either level, return how many'''
+        keys = [key for key in keys if key is not None]
+        with self.lock:
+            cached = [key for key in keys if key in self.l1.cache_data]
+            removed = self.l1.delete_many(cached)
+            cached = set(cached)
+            return removed + len(self._l2_delete(
+                [dumps(key) for key in keys if key not in cached]))
+
+    def reap(self):
+        '''Remove the expired items of both levels, return how many'''
+        with self.lock:
+            removed = self.l1.reap()
+            return removed + len(self._l2_remove(
+                'expires_at <= ?', (time.time(),)))
+
+    def stats(self):
+        '''Counters and size of L1, with those of L2 under l2'''
+        with self.lock:
+            stats = self.l1.stats()
+            l2 = dict(self.l2_counters)
+            l2['size'] = self.l2_count
+            l2['bytes'] = self.l2_bytes
+            stats['l2'] = l2
+            return stats
+
+    def close(self):
+        '''Close the SQLite database'''
+        with self.lock:
+            self.db.close()
+
+    def _l1_put(self, items, ttl):
+        '''Put a dict of items in L1 and remember when they expire'''
+        if ttl is None:
+            ttl = self.ttl
+        deadline = None if ttl is None else self.l1.clock() + ttl
+        for key in items:
+            self._set_deadline(key, deadline)
+        self.l1.put_many(items, ttl)
+        for key in items:
+            if key in self.l1.cache_data:
+                # Again, in case the batch demoted it then put it back
+                self._set_deadline(key, deadline)
+            else:
+                # Too heavy for L1, or evicted by its own batch
+                self.deadlines.pop(key, None)
+
+    def _set_deadline(self, key, deadline):
+        '''Remember when a key of L1 expires, never if None'''
+        if deadline is None:
+            self.deadlines.pop(key, None)
+        else:
+            self.deadlines[key] = deadline
+
+    def _demote(self, key, item, reason):
+        '''Listener of L1, moving the entries evicted for room to L2'''
+        deadline = self.deadlines.pop(key, None)
+        if reason != CAPACITY:
+            return
+        expires_at = None
+        if deadline is not None:
+            left = deadline - self.l1.clock()
+            if left <= 0:
+                return
+            expires_at = time.time() + left
+        data = dumps(key)
+        item_data = dumps(item)
+        size = len(data) + len(item_data)
+        if self.l2_max_bytes is not None and size > self.l2_max_bytes:
+            # Could never fit, even in an empty L2
+            return
+        if key in self.batch:
+            # Demoted earlier in the same batch, then put back in L1
+            self._l2_delete([data])
+        self.l2_counters['demotions'] += 1
+        self.db.execute(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+            (data, item_data, size, expires_at, time.time()))
+        self.l2_count += 1
+        self.l2_bytes += size
+        self._l2_trim()
+
+    def _l2_trim(self):
+        '''Evict the expired, then the least recently used L2 entries'''
+        if not self._l2_full():
+            return
+        self._l2_remove('expires_at <= ?', (time.time(),))
+        while self._l2_full():
+            excess = max(self.l2_count - self.l2_max_items, 1)
+            self._l2_remove('key IN (SELECT key FROM entries '
+                            'ORDER BY last_access LIMIT ?)', (excess,))
+
+    def _l2_full(self):
+        '''Tell if L2 holds more than its capacity'''
+        if self.l2_count > self.l2_max_items:
+            return True
+        return (self.l2_max_bytes is not None and
+                self.l2_bytes > self.l2_max_bytes)
+
+    def _l2_delete(self, pickled_keys):
+        '''Remove pickled keys from L2, return their rows'''
+        entries = []
+        if not self.l2_count:
+            return entries
+        for start in range(0, len(pickled_keys), BATCH):
+            batch = pickled_keys[start:start + BATCH]
+            entries.extend(self._l2_remove('key IN ({})'.format(
+                ', '.join('?' * len(batch))), batch))
+        return entries
+
+    def _l2_remove(self, where, parameters):
+        '''Remove the L2 rows matching a condition, return them'''
+        entries = self.db.execute(
+            'SELECT key, item, size, expires_at FROM entries WHERE ' +
+            where, parameters).fetchall()
+        if entries:
+            self.db.execute('DELETE FROM entries WHERE ' + where,
+                            parameters)
+            self.l2_count -= len(entries)
+            self.l2_bytes -= sum(entry[2] for entry in entries)
+        return entries
+
+    def _promote(self, keys):
+        '''Move the L2 entries of keys to L1, return their items'''
+        pickled = {dumps(key): key for key in keys}
+        found = {}
+        now = time.time()
+        for data, item_data, _, expires_at in self._l2_delete(
+                list(pickled)):
+            if expires_at is not None and expires_at <= now:
+                continue
+            key = pickled[data]
+            found[key] = pickle.loads(item_data)
+            ttl = None if expires_at is None else expires_at - now
+            self._l1_put({key: found[key]}, ttl)
+        self.l2_counters['hits'] += len(found)
+        self.l2_counters['misses'] += len(keys) - len(found)
+        return found
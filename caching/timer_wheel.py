@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+'''TimerWheel module'''
+
+
+class TimerWheel:
+    '''
+    Hierarchical timer wheel scheduling keys to expire at a deadline.
+
+    Level 0 has one bucket per tick, and each bucket of level n spans a
+    whole turn of level n - 1. Timers far away sit in a coarse bucket and
+    cascade down to finer levels as time advances, so scheduling,
+    cancelling and expiring a timer are all amortized O(1). A jump of
+    more ticks than there are timers replaces every timer instead of
+    stepping through the ticks, so advancing after an idle period costs
+    O(min(elapsed ticks, timers)).
+    '''
+
+    def __init__(self, now=0.0, tick=1.0, slots=64, levels=4):
+        '''Initialize TimerWheel with the current time in seconds'''
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+        if slots < 2 or levels < 1:
+            raise ValueError("a wheel needs 2 slots and 1 level at least")
+        self.tick = tick
+        self.slots = slots
+        self.current = int(now / tick)
+        self.wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        # Bucket of every scheduled key, to cancel it in O(1)
+        self.timers = {}
+
+    def __len__(self):
+        '''Number of scheduled keys'''
+        return len(self.timers)
+
+    def schedule(self, key, deadline):
+        '''Schedule a key to expire at deadline, replacing its timer'''
+        self.cancel(key)
+        expires = int(-(-deadline // self.tick))
+        self._place(key, max(expires, self.current + 1))
+
+    def cancel(self, key):
+        '''Unschedule a key if it is scheduled'''
+        bucket = self.timers.pop(key, None)
+        if bucket is not None:
+            del bucket[key]
+
+    def advance(self, now):
+        '''Move the wheel to now and return the keys expired since'''
+        target = int(now // self.tick)
+        expired = []
+        if target <= self.current:
+            return expired
+        if not self.timers:
+            self.current = target
+            return expired
+        elapsed = target - self.current
+        if elapsed >= self.slots ** len(self.wheels) or (
+                elapsed >= self.slots and len(self.timers) < elapsed):
+            # Stepping through every tick would cost more than placing
+            # every timer again
+            return self._rebuild(target)
+        while self.current < target:
+            self.current += 1
+            self._cascade(1)
+            bucket = self.wheels[0][self.current % self.slots]
+            if bucket:
+                self.wheels[0][self.current % self.slots] = {}
+                for key, expires in bucket.items():
+                    if expires > self.current:
+                        # Turns away in a wheel of a single level
+                        self._place(key, expires)
+                    else:
+                        del self.timers[key]
+                        expired.append(key)
+        return expired
+
+    def _place(self, key, expires):
+        '''Put a key in the bucket matching its expiry tick'''
+        delta = expires - self.current
+        level = 0
+        span = self.slots
+        while delta >= span and level < len(self.wheels) - 1:
+            span *= self.slots
+            level += 1
+        index = (expires // (self.slots ** level)) % self.slots
+        bucket = self.wheels[level][index]
+        bucket[key] = expires
+        self.timers[key] = bucket
+
+    def _cascade(self, level):
+        '''Redistribute the bucket of a level the wheel just reached'''
+        if level >= len(self.wheels):
+            return
+        if self.current % (self.slots ** level):
+            return
+        self._cascade(level + 1)
+        index = (self.current // (self.slots ** level)) % self.slots
+        bucket = self.wheels[level][index]
+        if bucket:
+            self.wheels[level][index] = {}
+            for key, expires in bucket.items():
+                self._place(key, expires)
+
+    def _rebuild(self, target):
+        '''Jump to target, expiring and replacing every timer'''
+        timers = [(key, bucket[key]) for key, bucket in self.timers.items()]
+        for level in self.wheels:
+            for index in range(self.slots):
+                level[index] = {}
+        self.timers = {}
+        self.current = target
+        expired = []
+        for key, expires in timers:
+            if expires <= target:
+                expired.append((expires, key))
+            else:
+                self._place(key, expires)
+        # In expiry order, as stepping tick by tick would return them
+        expired.sort(key=lambda timer: timer[0])
+        return [key for _, key in expired]
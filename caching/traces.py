@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+'''Synthetic access traces module'''
+
+
+import itertools
+import random
+
+
+def zipf(length, keys, skew, seed=0):
+    '''Keys drawn from a Zipf distribution of the given skew'''
+    rng = random.Random(seed)
+    weights = [1 / rank ** skew for rank in range(1, keys + 1)]
+    cum_weights = list(itertools.accumulate(weights))
+    population = list(range(keys))
+    # Popular keys are spread over the key space, not 0, 1, 2...
+    rng.shuffle(population)
+    return rng.choices(population, cum_weights=cum_weights, k=length)
+
+
+def scan(length, start=0):
+    '''Keys all different, read one after the other'''
+    return list(range(start, start + length))
+
+
+def loop(length, keys):
+    '''The same keys read over and over in the same order'''
+    return [index % keys for index in range(length)]
+
+
+def mixed(length, keys, skew, scan_every=1000, scan_length=200, seed=0):
+    '''A Zipf trace interrupted by one-off scans of new keys'''
+    trace = []
+    hot = zipf(length, keys, skew, seed)
+    start = keys
+    for index in range(0, length, scan_every):
+        trace.extend(hot[index:index + scan_every])
+        trace.extend(scan(scan_length, start))
+        start += scan_length
+    return trace[:length]
+
+
+def standard_traces(length, keys=10000, seed=0):
+    '''Name and keys of every trace the benchmark replays'''
+    return [
+        ('zipf-0.6', zipf(length, keys, 0.6, seed)),
+        ('zipf-0.9', zipf(length, keys, 0.9, seed)),
+        ('zipf-1.2', zipf(length, keys, 1.2, seed)),
+        ('scan', scan(length)),
+        ('loop', loop(length, keys // 10)),
+        ('mixed', mixed(length, keys, 0.9, seed=seed)),
+    ]